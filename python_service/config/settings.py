@@ -3,13 +3,37 @@ PhantomHand 配置文件
 包含手势识别阈值、状态机参数、服务器配置等
 """
 
+import types
 from dataclasses import dataclass, field
-from typing import Dict
-
-
-@dataclass
+from typing import Dict, Mapping
+
+
+# 默认映射是常量，模块级只读视图避免每个配置实例重建字典，
+# 也防止使用方意外原地修改；需要可变副本时用 dict(...) 拷贝
+_DEFAULT_GESTURE_PRIORITY: Mapping[str, int] = types.MappingProxyType({
+    "pinch": 5,
+    "fist": 4,
+    "point": 3,
+    "open": 2,
+    "slide": 1,
+    "idle": 0
+})
+
+_DEFAULT_MAPPINGS: Mapping[str, str] = types.MappingProxyType({
+    "open": "activate",              # 张开手掌：激活控制
+    "fist": "media_pause",           # 握拳：暂停/静音
+    "pinch": "mouse_click",          # 捏合：鼠标点击
+    "point": "mouse_move",           # 指向：鼠标移动
+    "slide_left": "switch_window",   # 左滑：切换窗口
+    "slide_right": "switch_window",  # 右滑：切换窗口
+    "slide_up": "volume_up",         # 上滑：音量增加
+    "slide_down": "volume_down",     # 下滑：音量减少
+})
+
+
+@dataclass(frozen=True, slots=True)
 class GestureThresholds:
-    """手势识别阈值配置"""
+    """手势识别阈值配置（冻结 + __slots__，属性读取更快且不可变）"""
 
     # 手指伸展判定阈值（角度，弧度制）
     finger_extended_angle: float = 2.5  # 小于此角度认为伸直
@@ -30,9 +54,9 @@ class GestureThresholds:
     slide_max_z_change: float = 0.05    # 最大Z轴变化（防止前后移动误判）
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StateMachineConfig:
-    """状态机配置"""
+    """状态机配置（冻结 + __slots__，属性读取更快且不可变）"""
 
     # 概率阈值
     p_high: float = 0.4      # 进入手势的高阈值
@@ -49,35 +73,22 @@ class StateMachineConfig:
     median_window: int = 5   # 中值滤波窗口大小
 
     # 手势优先级（数字越大优先级越高）
-    gesture_priority: Dict[str, int] = field(default_factory=lambda: {
-        "pinch": 5,
-        "fist": 4,
-        "point": 3,
-        "open": 2,
-        "slide": 1,
-        "idle": 0
-    })
+    # mappingproxy 不可哈希，dataclass 不接受其作直接默认值，
+    # 用 factory 返回同一单例，仍然零拷贝
+    gesture_priority: Mapping[str, int] = field(
+        default_factory=lambda: _DEFAULT_GESTURE_PRIORITY)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ActionMapping:
-    """手势到动作的映射配置"""
+    """手势到动作的映射配置（冻结 + __slots__）"""
 
     # 鼠标控制
     mouse_sensitivity: float = 1.5      # 鼠标灵敏度
     mouse_smoothing: float = 0.7        # 鼠标平滑系数
 
-    # 默认手势映射
-    mappings: Dict[str, str] = field(default_factory=lambda: {
-        "open": "activate",              # 张开手掌：激活控制
-        "fist": "media_pause",           # 握拳：暂停/静音
-        "pinch": "mouse_click",          # 捏合：鼠标点击
-        "point": "mouse_move",           # 指向：鼠标移动
-        "slide_left": "switch_window",   # 左滑：切换窗口
-        "slide_right": "switch_window",  # 右滑：切换窗口
-        "slide_up": "volume_up",         # 上滑：音量增加
-        "slide_down": "volume_down",     # 下滑：音量减少
-    })
+    # 默认手势映射（只读视图，需要修改时先 dict(...) 拷贝）
+    mappings: Mapping[str, str] = field(default_factory=lambda: _DEFAULT_MAPPINGS)
 
 
 @dataclass
@@ -1,13 +1,19 @@
 """
 PhantomHand 核心模块
 包含手势检测、识别、状态机等核心功能
+
+使用 PEP 562 延迟导入：OpenCV / MediaPipe / Win32 绑定只在
+首次访问对应类时才真正加载，降低冷启动开销
 """
 
-from .capture import CameraCapture
-from .detector import HandDetector
-from .gesture import GestureClassifier
-from .state_machine import GestureStateMachine
-from .action import ActionExecutor
+# 类名 -> 所在子模块
+_LAZY = {
+    "CameraCapture": "capture",
+    "HandDetector": "detector",
+    "GestureClassifier": "gesture",
+    "GestureStateMachine": "state_machine",
+    "ActionExecutor": "action",
+}
 
 __all__ = [
     "CameraCapture",
@@ -16,3 +22,17 @@ __all__ = [
     "GestureStateMachine",
     "ActionExecutor"
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+        mod = importlib.import_module("." + _LAZY[name], __name__)
+        obj = getattr(mod, name)
+        globals()[name] = obj  # 缓存，后续访问不再经过 __getattr__
+        return obj
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(__all__)
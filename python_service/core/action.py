@@ -4,14 +4,17 @@
 """
 
 import time
+import contextlib
+import collections
 from typing import Callable, Dict, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import threading
 
-# Windows 平台相关
+# Windows 平台相关（只在模块加载时判定一次，热路径不再调用 platform.system()）
 import platform
-if platform.system() == "Windows":
+_IS_WINDOWS = platform.system() == "Windows"
+if _IS_WINDOWS:
     import ctypes
     from ctypes import wintypes
 
@@ -73,6 +76,18 @@ if platform.system() == "Windows":
     # 加载 user32.dll
     user32 = ctypes.windll.user32
 
+    # 绑定函数指针并声明原型，避免每次调用时的属性查找和参数类型推断
+    SendInput = user32.SendInput
+    SendInput.argtypes = [wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int]
+    SendInput.restype = wintypes.UINT
+
+    SetCursorPos = user32.SetCursorPos
+    SetCursorPos.argtypes = [ctypes.c_int, ctypes.c_int]
+    SetCursorPos.restype = wintypes.BOOL
+
+    # 缓存结构体大小，免去每次 sizeof 计算
+    _INPUT_SIZE = ctypes.sizeof(INPUT)
+
 
 class ActionType(Enum):
     """动作类型"""
@@ -113,47 +128,122 @@ class ActionExecutor:
     将手势映射到系统操作
     """
 
-    def __init__(self, config: Optional[ActionConfig] = None):
+    def __init__(self, config: Optional[ActionConfig] = None, thread_safe: bool = False):
+        """
+        Args:
+            config: 动作配置
+            thread_safe: 是否需要跨线程分发。事件默认由单一线程
+                （asyncio 回调或调试主循环）串行派发，无需真实锁
+        """
         self.config = config or ActionConfig()
 
         # 获取屏幕尺寸
-        if platform.system() == "Windows":
+        if _IS_WINDOWS:
             self.config.screen_width = user32.GetSystemMetrics(0)
             self.config.screen_height = user32.GetSystemMetrics(1)
 
+            # 预分配可复用的 INPUT 结构体（调用方通过 _action_lock 串行化，
+            # 避免每帧重新分配和清零 ctypes 联合体）
+            self._mouse_input = INPUT()
+            self._mouse_input.type = 0  # INPUT_MOUSE
+            self._key_input = INPUT()
+            self._key_input.type = 1    # INPUT_KEYBOARD
+            # 缓存嵌套结构体引用（指向同一块内存），
+            # 热路径免去 union.mi/union.ki 的多级描述符查找
+            self._mi = self._mouse_input.union.mi
+            self._ki = self._key_input.union.ki
+
+            # 组合键序列固定不变，预先填好 INPUT 数组，触发时零分配
+            self._alt_tab_combo = self._build_key_inputs([
+                (VK_MENU, False),
+                (VK_TAB, False),
+                (VK_TAB, True),
+                (VK_MENU, True),
+            ])
+            self._screenshot_combo = self._build_key_inputs([
+                (VK_LWIN, False),
+                (0x10, False),  # Shift
+                (0x53, False),  # S
+                (0x53, True),
+                (0x10, True),
+                (VK_LWIN, True),
+            ])
+
+            # Win32 输入工作线程：SendInput 在系统输入队列繁忙时可能阻塞，
+            # 不能卡住 30fps 的手势处理线程。鼠标位移在这里合并
+            # （只保留累计值），点击/按键按顺序排队执行
+            self._pending_move = [0, 0]
+            self._move_lock = threading.Lock()
+            self._pending_cmds: collections.deque = collections.deque()
+            self._win_cmd_ev = threading.Event()
+            self._win_thread = threading.Thread(
+                target=self._win_loop, daemon=True, name="win32-input"
+            )
+            self._win_thread.start()
+
         # 鼠标状态
         self._mouse_pressed = False
         self._last_mouse_pos: Optional[Tuple[float, float]] = None
         self._smoothed_pos: Optional[Tuple[float, float]] = None
 
-        # 相对定位状态
+        # 相对定位状态（平滑位移用两个标量保存，避免每帧元组分配）
         self._rel_last_pos: Optional[Tuple[float, float]] = None
-        self._rel_smoothed_delta: Tuple[float, float] = (0.0, 0.0)
+        self._sdx = 0.0
+        self._sdy = 0.0
         self._rel_is_lifted = True  # 初始为抬起状态
 
-        # 动作映射（open 和 fist 单独处理，不在此映射中）
-        self._gesture_action_map: Dict[str, ActionType] = {
-            "thumbs_up": ActionType.MOUSE_CLICK,  # 竖大拇指用于点击
-            "point": ActionType.MOUSE_MOVE,
-            "victory": ActionType.SCREENSHOT,
-            "ok": ActionType.VOLUME_MUTE,
+        # 预计算增益和平滑系数（配置变更时需调用 _update_derived_params）
+        self._update_derived_params()
+
+        # 按配置绑定鼠标移动实现，热路径不再每帧判断 mouse_mode
+        self._bind_mouse_mode()
+
+        # 动作分发表：(手势, 事件类型) -> 处理函数(hand_pos, meta)
+        # 单次字典查找代替枚举映射 + if/elif 链
+        # （open 和 fist 单独处理，不在此映射中）
+        self._gesture_handlers: Dict[Tuple[str, str], Callable] = {
+            # 竖大拇指用于点击
+            ("thumbs_up", "enter"): lambda pos, meta: self._mouse_down(),
+            ("thumbs_up", "exit"): lambda pos, meta: self._mouse_up(),
+            # 指向用于移动鼠标（exit 时重置追踪，相当于"抬手"）
+            ("point", "enter"): lambda pos, meta: pos and self._move_mouse(pos),
+            ("point", "hold"): lambda pos, meta: pos and self._move_mouse(pos),
+            ("point", "exit"): lambda pos, meta: self.reset_mouse_tracking(),
+            ("victory", "enter"): lambda pos, meta: self._screenshot(),
+            ("ok", "enter"): lambda pos, meta: self._volume_mute(),
         }
 
-        # 滑动方向映射
-        self._slide_action_map: Dict[str, ActionType] = {
-            "left": ActionType.SWITCH_WINDOW,
-            "right": ActionType.SWITCH_WINDOW,
-            "up": ActionType.VOLUME_UP,
-            "down": ActionType.VOLUME_DOWN,
+        # 滑动分发表：方向 -> 处理函数()
+        self._slide_handlers: Dict[str, Callable[[], None]] = {
+            "left": lambda: self._switch_window(forward=False),
+            "right": lambda: self._switch_window(forward=True),
+            "up": lambda: self._volume_change(up=True),
+            "down": lambda: self._volume_change(up=False),
         }
 
         # 控制是否激活
         self._active = False
-        self._action_lock = threading.Lock()
+        # 单线程分发时用 nullcontext 代替真实锁，省去每个事件两次锁操作
+        self._action_lock = threading.Lock() if thread_safe else contextlib.nullcontext()
 
         # 激活状态变更回调（用于通知 server 广播状态）
         self._on_active_changed: Optional[Callable[[bool], None]] = None
 
+    def _update_derived_params(self):
+        """根据配置预计算热路径使用的派生参数"""
+        self._gain_x = self.config.screen_width * self.config.mouse_speed
+        self._gain_y = self.config.screen_height * self.config.mouse_speed
+        self._ema_alpha = self.config.mouse_delta_smoothing
+        self._one_minus_alpha = 1.0 - self._ema_alpha
+        # EMA 是线性滤波，增益可提前折入输入系数：
+        # 平滑状态直接以像素为单位，每帧每轴省一次乘法
+        self._kx = self._one_minus_alpha * self._gain_x
+        self._ky = self._one_minus_alpha * self._gain_y
+        # 死区换算到像素单位，热路径用整数比较，
+        # 不再读 mouse_deadzone / screen_width 也不做浮点乘法
+        self._deadzone_x_px = int(self.config.mouse_deadzone * self._gain_x)
+        self._deadzone_y_px = int(self.config.mouse_deadzone * self._gain_y)
+
     def set_on_active_changed(self, callback: Callable[[bool], None]):
         """设置激活状态变更回调"""
         self._on_active_changed = callback
@@ -175,7 +265,8 @@ class ActionExecutor:
             self._release_all()
         # 重置相对定位状态
         self._rel_last_pos = None
-        self._rel_smoothed_delta = (0.0, 0.0)
+        self._sdx = 0.0
+        self._sdy = 0.0
         self._rel_is_lifted = True
 
         # 通知状态变更
@@ -203,8 +294,9 @@ class ActionExecutor:
             meta: 附加信息
         """
         # open 手势用于激活控制（无论当前是否激活都可以触发）
+        # 注意不要在这里无条件打印：hold 事件约 30Hz，
+        # 控制台写入（尤其 Windows）会拖垮热路径，只在状态翻转时输出
         if gesture == "open":
-            print(f"[ACTION] 收到 open 手势, event_type={event_type}, active={self._active}", flush=True)
             if event_type == "enter" and not self._active:
                 self.set_active(True)
                 print("[ACTION] 控制已激活 (open 手势)")
@@ -221,32 +313,13 @@ class ActionExecutor:
         if not self._active:
             return
 
+        # 查表分发
+        handler = self._gesture_handlers.get((gesture, event_type))
+        if not handler:
+            return
+
         with self._action_lock:
-            # 根据手势执行动作
-            action = self._gesture_action_map.get(gesture)
-            if not action:
-                return
-
-            if action == ActionType.MOUSE_MOVE:
-                if hand_pos and event_type in ("enter", "hold"):
-                    self._move_mouse(hand_pos)
-                elif event_type == "exit":
-                    # 手势退出时重置追踪（相当于"抬手"）
-                    self.reset_mouse_tracking()
-
-            elif action == ActionType.MOUSE_CLICK:
-                if event_type == "enter":
-                    self._mouse_down()
-                elif event_type == "exit":
-                    self._mouse_up()
-
-            elif action == ActionType.VOLUME_MUTE:
-                if event_type == "enter":
-                    self._volume_mute()
-
-            elif action == ActionType.SCREENSHOT:
-                if event_type == "enter":
-                    self._screenshot()
+            handler(hand_pos, meta)
 
     def execute_slide(self, direction: str, distance: float):
         """
@@ -259,38 +332,42 @@ class ActionExecutor:
         if not self._active:
             return
 
-        with self._action_lock:
-            action = self._slide_action_map.get(direction)
-            if not action:
-                return
-
-            if action == ActionType.SWITCH_WINDOW:
-                self._switch_window(direction == "right")
-
-            elif action == ActionType.VOLUME_UP:
-                self._volume_change(up=True)
+        handler = self._slide_handlers.get(direction)
+        if not handler:
+            return
 
-            elif action == ActionType.VOLUME_DOWN:
-                self._volume_change(up=False)
+        with self._action_lock:
+            handler()
 
     # ========== Windows 平台实现 ==========
 
-    def _move_mouse(self, pos: Tuple[float, float]):
-        """移动鼠标"""
-        if platform.system() != "Windows":
-            return
-
-        if self.config.mouse_mode == "relative":
-            self._move_mouse_relative(pos)
+    def _bind_mouse_mode(self):
+        """根据 mouse_mode 将 _move_mouse 绑定为具体实现（实例属性遮蔽）"""
+        if not _IS_WINDOWS:
+            self._move_mouse = lambda pos: None
+        elif self.config.mouse_mode == "relative":
+            self._move_mouse = self._move_mouse_relative
         else:
-            self._move_mouse_absolute(pos)
+            self._move_mouse = self._move_mouse_absolute
+
+    def set_mouse_mode(self, mode: str):
+        """
+        切换鼠标定位模式
+
+        Args:
+            mode: "relative" 或 "absolute"
+        """
+        self.config.mouse_mode = mode
+        self._bind_mouse_mode()
+        self.reset_mouse_tracking()
 
     def _move_mouse_relative(self, pos: Tuple[float, float]):
         """相对定位模式（类似触摸板）"""
         # 如果是抬起状态或没有上一个位置，初始化参考点
         if self._rel_is_lifted or self._rel_last_pos is None:
             self._rel_last_pos = pos
-            self._rel_smoothed_delta = (0.0, 0.0)
+            self._sdx = 0.0
+            self._sdy = 0.0
             self._rel_is_lifted = False
             return
 
@@ -299,36 +376,70 @@ class ActionExecutor:
         dy_raw = pos[1] - self._rel_last_pos[1]
         self._rel_last_pos = pos
 
-        # 位移平滑 (EMA)
-        alpha = self.config.mouse_delta_smoothing
-        self._rel_smoothed_delta = (
-            alpha * self._rel_smoothed_delta[0] + (1 - alpha) * dx_raw,
-            alpha * self._rel_smoothed_delta[1] + (1 - alpha) * dy_raw,
-        )
-
-        # 死区检测
-        if (abs(self._rel_smoothed_delta[0]) < self.config.mouse_deadzone and
-            abs(self._rel_smoothed_delta[1]) < self.config.mouse_deadzone):
-            return
+        # 位移平滑 (EMA)，状态保存在像素空间，增益已折入系数
+        sdx = self._ema_alpha * self._sdx + self._kx * dx_raw
+        sdy = self._ema_alpha * self._sdy + self._ky * dy_raw
+        self._sdx = sdx
+        self._sdy = sdy
 
-        # 归一化位移 -> 像素位移，应用速度增益
-        dx_px = int(self._rel_smoothed_delta[0] * self.config.screen_width * self.config.mouse_speed)
-        dy_px = int(self._rel_smoothed_delta[1] * self.config.screen_height * self.config.mouse_speed)
+        # SendInput 需要 LONG 整型像素位移，死区检测直接在像素空间
+        dx_px = int(sdx)
+        dy_px = int(sdy)
 
-        if dx_px == 0 and dy_px == 0:
+        if abs(dx_px) <= self._deadzone_x_px and abs(dy_px) <= self._deadzone_y_px:
             return
 
         # 发送相对移动
         self._send_mouse_move_relative(dx_px, dy_px)
 
+    def _win_loop(self):
+        """
+        Win32 输入工作线程主循环
+
+        合并待发送的鼠标位移（只发累计值，减少抖动），
+        然后按顺序执行排队的点击/按键命令
+        """
+        while True:
+            self._win_cmd_ev.wait()
+            self._win_cmd_ev.clear()
+
+            # 原子取走累计位移
+            with self._move_lock:
+                dx = self._pending_move[0]
+                dy = self._pending_move[1]
+                self._pending_move[0] = 0
+                self._pending_move[1] = 0
+
+            if dx or dy:
+                self._emit_mouse_move_relative(dx, dy)
+
+            while self._pending_cmds:
+                cmd = self._pending_cmds.popleft()
+                try:
+                    cmd()
+                except Exception as e:
+                    print(f"[WARN] 输入命令执行异常: {e}")
+
+    def _dispatch_win_cmd(self, cmd: Callable[[], None]):
+        """将输入命令排队到 Win32 工作线程"""
+        self._pending_cmds.append(cmd)
+        self._win_cmd_ev.set()
+
     def _send_mouse_move_relative(self, dx: int, dy: int):
-        """发送相对鼠标移动"""
-        inp = INPUT()
-        inp.type = 0  # INPUT_MOUSE
-        inp.union.mi.dx = dx
-        inp.union.mi.dy = dy
-        inp.union.mi.dwFlags = MOUSEEVENTF_MOVE
-        user32.SendInput(1, ctypes.byref(inp), ctypes.sizeof(INPUT))
+        """提交相对鼠标移动（合并到工作线程，不阻塞手势线程）"""
+        with self._move_lock:
+            self._pending_move[0] += dx
+            self._pending_move[1] += dy
+        self._win_cmd_ev.set()
+
+    def _emit_mouse_move_relative(self, dx: int, dy: int):
+        """发送相对鼠标移动（仅在工作线程调用）"""
+        mi = self._mi
+        mi.dx = dx
+        mi.dy = dy
+        mi.mouseData = 0
+        mi.dwFlags = MOUSEEVENTF_MOVE
+        SendInput(1, ctypes.byref(self._mouse_input), _INPUT_SIZE)
 
     def _move_mouse_absolute(self, pos: Tuple[float, float]):
         """绝对定位模式"""
@@ -355,18 +466,19 @@ class ActionExecutor:
         y = max(0, min(y, self.config.screen_height - 1))
 
         # 移动鼠标
-        user32.SetCursorPos(x, y)
+        SetCursorPos(x, y)
 
     def reset_mouse_tracking(self):
         """重置鼠标追踪状态（用于抬手重新定位）"""
         self._rel_last_pos = None
-        self._rel_smoothed_delta = (0.0, 0.0)
+        self._sdx = 0.0
+        self._sdy = 0.0
         self._rel_is_lifted = True
         self._smoothed_pos = None
 
     def _mouse_down(self):
         """鼠标按下"""
-        if platform.system() != "Windows" or self._mouse_pressed:
+        if not _IS_WINDOWS or self._mouse_pressed:
             return
 
         self._mouse_pressed = True
@@ -375,7 +487,7 @@ class ActionExecutor:
 
     def _mouse_up(self):
         """鼠标释放"""
-        if platform.system() != "Windows" or not self._mouse_pressed:
+        if not _IS_WINDOWS or not self._mouse_pressed:
             return
 
         self._mouse_pressed = False
@@ -383,36 +495,85 @@ class ActionExecutor:
         print("[ACTION] 鼠标释放")
 
     def _send_mouse_event(self, flags: int, data: int = 0):
-        """发送鼠标事件"""
-        if platform.system() != "Windows":
+        """提交鼠标事件到工作线程"""
+        if not _IS_WINDOWS:
             return
 
-        inp = INPUT()
-        inp.type = 0  # INPUT_MOUSE
-        inp.union.mi.dwFlags = flags
-        inp.union.mi.mouseData = data
-        user32.SendInput(1, ctypes.byref(inp), ctypes.sizeof(INPUT))
+        self._dispatch_win_cmd(lambda: self._emit_mouse_event(flags, data))
+
+    def _emit_mouse_event(self, flags: int, data: int = 0):
+        """发送鼠标事件（仅在工作线程调用）"""
+        mi = self._mi
+        mi.dx = 0
+        mi.dy = 0
+        mi.dwFlags = flags
+        mi.mouseData = data
+        SendInput(1, ctypes.byref(self._mouse_input), _INPUT_SIZE)
 
     def _send_key(self, vk: int, up: bool = False):
-        """发送键盘事件"""
-        if platform.system() != "Windows":
+        """提交键盘事件到工作线程"""
+        if not _IS_WINDOWS:
+            return
+
+        self._dispatch_win_cmd(lambda: self._emit_key(vk, up))
+
+    def _emit_key(self, vk: int, up: bool = False):
+        """发送键盘事件（仅在工作线程调用）"""
+        ki = self._ki
+        ki.wVk = vk
+        ki.dwFlags = KEYEVENTF_KEYUP if up else 0
+        SendInput(1, ctypes.byref(self._key_input), _INPUT_SIZE)
+
+    @staticmethod
+    def _build_key_inputs(events):
+        """
+        构建键盘事件 INPUT 数组
+
+        Args:
+            events: (虚拟键码, 是否释放) 元组列表
+
+        Returns:
+            填好的 (INPUT * N) ctypes 数组
+        """
+        arr = (INPUT * len(events))()
+        for i, (vk, up) in enumerate(events):
+            arr[i].type = 1  # INPUT_KEYBOARD
+            arr[i].union.ki.wVk = vk
+            arr[i].union.ki.dwFlags = KEYEVENTF_KEYUP if up else 0
+        return arr
+
+    def _send_inputs(self, events):
+        """
+        批量发送键盘事件
+
+        一次 SendInput 调用提交整个按键序列（Windows 保证按顺序处理），
+        避免组合键中逐键 SendInput + sleep 造成的系统调用和延迟开销
+
+        Args:
+            events: (虚拟键码, 是否释放) 元组列表
+        """
+        if not _IS_WINDOWS:
             return
 
-        inp = INPUT()
-        inp.type = 1  # INPUT_KEYBOARD
-        inp.union.ki.wVk = vk
-        inp.union.ki.dwFlags = KEYEVENTF_KEYUP if up else 0
-        user32.SendInput(1, ctypes.byref(inp), ctypes.sizeof(INPUT))
+        arr = self._build_key_inputs(events)
+        SendInput(len(events), ctypes.cast(arr, ctypes.POINTER(INPUT)), _INPUT_SIZE)
 
     def _press_key(self, vk: int):
-        """按下并释放按键"""
-        self._send_key(vk, up=False)
+        """按下并释放按键（整个按键过程在工作线程执行，含间隔）"""
+        if not _IS_WINDOWS:
+            return
+
+        self._dispatch_win_cmd(lambda: self._emit_press_key(vk))
+
+    def _emit_press_key(self, vk: int):
+        """按下并释放按键（仅在工作线程调用）"""
+        self._emit_key(vk, up=False)
         time.sleep(0.05)
-        self._send_key(vk, up=True)
+        self._emit_key(vk, up=True)
 
     def _volume_change(self, up: bool):
         """调节音量"""
-        if platform.system() != "Windows":
+        if not _IS_WINDOWS:
             return
 
         vk = VK_VOLUME_UP if up else VK_VOLUME_DOWN
@@ -421,7 +582,7 @@ class ActionExecutor:
 
     def _volume_mute(self):
         """静音切换"""
-        if platform.system() != "Windows":
+        if not _IS_WINDOWS:
             return
 
         self._press_key(VK_VOLUME_MUTE)
@@ -429,7 +590,7 @@ class ActionExecutor:
 
     def _media_play_pause(self):
         """播放/暂停"""
-        if platform.system() != "Windows":
+        if not _IS_WINDOWS:
             return
 
         self._press_key(VK_MEDIA_PLAY_PAUSE)
@@ -437,31 +598,28 @@ class ActionExecutor:
 
     def _switch_window(self, forward: bool = True):
         """切换窗口 (Alt+Tab)"""
-        if platform.system() != "Windows":
+        if not _IS_WINDOWS:
             return
 
-        # Alt + Tab
-        self._send_key(VK_MENU, up=False)
-        time.sleep(0.05)
-        self._press_key(VK_TAB)
-        time.sleep(0.05)
-        self._send_key(VK_MENU, up=True)
+        # Alt + Tab（预构建数组，工作线程一次 SendInput 提交）
+        self._dispatch_win_cmd(lambda: SendInput(
+            len(self._alt_tab_combo),
+            ctypes.cast(self._alt_tab_combo, ctypes.POINTER(INPUT)),
+            _INPUT_SIZE
+        ))
         print(f"[ACTION] 切换窗口 ({'前进' if forward else '后退'})")
 
     def _screenshot(self):
         """截屏 (Win + Shift + S)"""
-        if platform.system() != "Windows":
+        if not _IS_WINDOWS:
             return
 
-        # Win + Shift + S
-        self._send_key(VK_LWIN, up=False)
-        time.sleep(0.02)
-        self._send_key(0x10, up=False)  # Shift
-        time.sleep(0.02)
-        self._press_key(0x53)  # S
-        time.sleep(0.02)
-        self._send_key(0x10, up=True)
-        self._send_key(VK_LWIN, up=True)
+        # Win + Shift + S（预构建数组，工作线程一次 SendInput 提交）
+        self._dispatch_win_cmd(lambda: SendInput(
+            len(self._screenshot_combo),
+            ctypes.cast(self._screenshot_combo, ctypes.POINTER(INPUT)),
+            _INPUT_SIZE
+        ))
         print("[ACTION] 截屏")
 
     def _release_all(self):
@@ -3,18 +3,19 @@
 负责从摄像头获取视频帧，并进行基础预处理
 """
 
+import asyncio
 import cv2
 import numpy as np
 from typing import Optional, Tuple, Generator
 from dataclasses import dataclass
 import threading
-import queue
+import collections
 import time
 
 
-@dataclass
+@dataclass(slots=True)
 class Frame:
-    """视频帧数据结构"""
+    """视频帧数据结构（slots 降低每帧构造开销和内存占用）"""
     image: np.ndarray           # BGR 图像数据
     frame_id: int               # 帧序号
     timestamp: float            # 时间戳（毫秒）
@@ -35,7 +36,8 @@ class CameraCapture:
         height: int = 480,
         fps: int = 30,
         mirror: bool = True,
-        buffer_size: int = 2
+        buffer_size: int = 2,
+        mirror_view_only: bool = False
     ):
         """
         初始化摄像头
@@ -47,21 +49,27 @@ class CameraCapture:
             fps: 目标帧率
             mirror: 是否水平翻转（镜像模式）
             buffer_size: 帧缓冲区大小
+            mirror_view_only: 镜像时只返回反转视图（零拷贝），
+                要求下游能接受非连续内存
         """
         self.device_id = device_id
         self.width = width
         self.height = height
         self.fps = fps
         self.mirror = mirror
+        self.mirror_view_only = mirror_view_only
         self.buffer_size = buffer_size
 
         # 内部状态
         self._cap: Optional[cv2.VideoCapture] = None
-        self._frame_queue: queue.Queue = queue.Queue(maxsize=buffer_size)
+        # 单槽最新帧缓冲：deque(maxlen=1).append 在 CPython 中是原子操作，
+        # 天然覆盖旧帧，避免 queue.Queue 每帧的条件变量开销
+        self._frame_slot: collections.deque = collections.deque(maxlen=1)
+        self._frame_event = threading.Event()
         self._running = False
         self._thread: Optional[threading.Thread] = None
         self._frame_count = 0
-        self._start_time = 0.0
+        self._start_ns = 0
 
     def start(self) -> bool:
         """
@@ -73,8 +81,17 @@ class CameraCapture:
         if self._running:
             return True
 
-        # 初始化摄像头
-        self._cap = cv2.VideoCapture(self.device_id)
+        # 初始化摄像头（显式指定后端，跳过默认的慢速探测路径）
+        import platform
+        system = platform.system()
+        if system == "Windows":
+            backend = cv2.CAP_DSHOW
+        elif system == "Linux":
+            backend = cv2.CAP_V4L2
+        else:
+            backend = cv2.CAP_ANY
+
+        self._cap = cv2.VideoCapture(self.device_id, backend)
         if not self._cap.isOpened():
             print(f"[ERROR] 无法打开摄像头 {self.device_id}")
             return False
@@ -83,6 +100,8 @@ class CameraCapture:
         self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
         self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
         self._cap.set(cv2.CAP_PROP_FPS, self.fps)
+        # 请求 MJPG 压缩格式，降低 USB 带宽占用
+        self._cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
 
         # 读取实际参数（可能与设置不同）
         actual_width = int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH))
@@ -91,9 +110,9 @@ class CameraCapture:
 
         print(f"[INFO] 摄像头已启动: {actual_width}x{actual_height} @ {actual_fps:.1f}fps")
 
-        # 启动采集线程
+        # 启动采集线程（时间基准用单调时钟，不受系统时间跳变影响）
         self._running = True
-        self._start_time = time.time() * 1000
+        self._start_ns = time.perf_counter_ns()
         self._frame_count = 0
         self._thread = threading.Thread(target=self._capture_loop, daemon=True)
         self._thread.start()
@@ -111,31 +130,36 @@ class CameraCapture:
             self._cap.release()
             self._cap = None
 
-        # 清空队列
-        while not self._frame_queue.empty():
-            try:
-                self._frame_queue.get_nowait()
-            except queue.Empty:
-                break
+        # 清空缓冲
+        self._frame_slot.clear()
+        self._frame_event.clear()
 
         print("[INFO] 摄像头已停止")
 
     def _capture_loop(self):
         """采集线程主循环"""
         while self._running and self._cap and self._cap.isOpened():
-            ret, image = self._cap.read()
+            # grab/retrieve 分离，便于后续按需跳过解码
+            if not self._cap.grab():
+                print("[WARN] 读取帧失败")
+                continue
 
+            ret, image = self._cap.retrieve()
             if not ret:
                 print("[WARN] 读取帧失败")
                 continue
 
-            # 镜像翻转
+            # 镜像翻转：NumPy 反转切片是零拷贝视图；默认再做一次
+            # SIMD memcpy 保证内存连续（绕过 cv2.flip 的 OpenCV 分配器），
+            # mirror_view_only 时直接交出视图
             if self.mirror:
-                image = cv2.flip(image, 1)
+                image = image[:, ::-1]
+                if not self.mirror_view_only:
+                    image = np.ascontiguousarray(image)
 
             # 创建帧对象
             self._frame_count += 1
-            timestamp = time.time() * 1000 - self._start_time
+            timestamp = (time.perf_counter_ns() - self._start_ns) * 1e-6
 
             frame = Frame(
                 image=image,
@@ -145,13 +169,9 @@ class CameraCapture:
                 height=image.shape[0]
             )
 
-            # 放入队列（如果满了则丢弃旧帧）
-            try:
-                if self._frame_queue.full():
-                    self._frame_queue.get_nowait()  # 丢弃旧帧
-                self._frame_queue.put_nowait(frame)
-            except queue.Full:
-                pass
+            # 写入单槽缓冲（自动覆盖旧帧）并唤醒消费者
+            self._frame_slot.append(frame)
+            self._frame_event.set()
 
     def read(self, timeout: float = 0.1) -> Optional[Frame]:
         """
@@ -163,11 +183,31 @@ class CameraCapture:
         Returns:
             Frame 对象，如果无可用帧则返回 None
         """
+        if not self._frame_event.wait(timeout):
+            return None
+
+        self._frame_event.clear()
         try:
-            return self._frame_queue.get(timeout=timeout)
-        except queue.Empty:
+            return self._frame_slot.popleft()
+        except IndexError:
             return None
 
+    async def read_async(self, timeout: float = 0.1) -> Optional[Frame]:
+        """
+        异步读取一帧（服务器模式用）
+
+        阻塞等待挪到默认执行器线程：事件循环不被 read 内部的条件
+        等待卡住，新帧一到协程即恢复，无需定时轮询
+
+        Args:
+            timeout: 单次等待超时（秒）
+
+        Returns:
+            Frame 对象，超时返回 None
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.read, timeout)
+
     def read_generator(self) -> Generator[Frame, None, None]:
         """
         帧生成器，用于迭代读取
@@ -188,9 +228,9 @@ class CameraCapture:
     @property
     def actual_fps(self) -> float:
         """计算实际帧率"""
-        if self._frame_count == 0 or self._start_time == 0:
+        if self._frame_count == 0 or self._start_ns == 0:
             return 0.0
-        elapsed = (time.time() * 1000 - self._start_time) / 1000
+        elapsed = (time.perf_counter_ns() - self._start_ns) * 1e-9
         return self._frame_count / elapsed if elapsed > 0 else 0.0
 
     def __enter__(self):
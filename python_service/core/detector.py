@@ -3,12 +3,20 @@
 使用 MediaPipe Hands 进行手部关键点检测
 """
 
+import atexit
+import functools
+import math
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import cv2
 import numpy as np
 import mediapipe as mp
 from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass, field
 from enum import IntEnum
+from functools import cached_property
 
 
 class LandmarkIndex(IntEnum):
@@ -55,6 +63,9 @@ FINGER_INDICES = {
     "pinky": (20, 19, 18, 17)
 }
 
+# 手掌中心使用的 MCP 关节索引（预构建 ndarray，省去每次 fancy-index 解析）
+_PALM_MCP_IDX = np.array([5, 9, 13, 17])
+
 # 骨骼连接定义（用于绘制）
 HAND_CONNECTIONS = [
     # 手掌
@@ -73,8 +84,9 @@ class HandLandmarks:
     """单手关键点数据"""
     hand_id: str                           # 手的标识符 (left/right/uuid)
     handedness: str                        # 左手/右手
-    landmarks: np.ndarray                  # 21x3 关键点坐标 (归一化)
-    landmarks_pixel: np.ndarray            # 21x2 像素坐标
+    landmarks: np.ndarray                  # 21x3 关键点坐标 (归一化, float32)
+    landmarks_xy: np.ndarray               # 21x2 平面坐标 (连续 float32 视图)
+    landmarks_pixel: np.ndarray            # 21x2 像素坐标 (int32)
     confidence: float                      # 检测置信度
     image_width: int                       # 原图宽度
     image_height: int                      # 原图高度
@@ -84,19 +96,24 @@ class HandLandmarks:
         """手腕位置"""
         return self.landmarks[LandmarkIndex.WRIST]
 
-    @property
+    @cached_property
     def palm_center(self) -> np.ndarray:
-        """手掌中心（使用 MCP 关节的平均位置）"""
-        mcp_indices = [5, 9, 13, 17]
-        return np.mean(self.landmarks[mcp_indices], axis=0)
-
-    @property
+        """手掌中心（使用 MCP 关节的平均位置，每帧只算一次）"""
+        return np.mean(self.landmarks[_PALM_MCP_IDX], axis=0)
+
+    @cached_property
+    def hand_scale_sq(self) -> float:
+        """手掌大小的平方（纯标量算术，无 NumPy 调度、无开方，
+        仅做阈值判断时用它比较平方量即可）"""
+        lm = self.landmarks
+        dx = float(lm[LandmarkIndex.INDEX_MCP, 0]) - float(lm[LandmarkIndex.PINKY_MCP, 0])
+        dy = float(lm[LandmarkIndex.INDEX_MCP, 1]) - float(lm[LandmarkIndex.PINKY_MCP, 1])
+        return dx * dx + dy * dy
+
+    @cached_property
     def hand_scale(self) -> float:
-        """手掌大小（食指MCP到小指MCP的距离，用于归一化）"""
-        return np.linalg.norm(
-            self.landmarks[LandmarkIndex.INDEX_MCP][:2] -
-            self.landmarks[LandmarkIndex.PINKY_MCP][:2]
-        )
+        """手掌大小（食指MCP到小指MCP的距离，用于归一化，每帧只算一次）"""
+        return math.sqrt(self.hand_scale_sq)
 
     def get_finger_tip(self, finger: str) -> np.ndarray:
         """获取指尖位置"""
@@ -142,7 +159,11 @@ class HandDetector:
         max_num_hands: int = 2,
         min_detection_confidence: float = 0.7,
         min_tracking_confidence: float = 0.5,
-        model_complexity: int = 1
+        model_complexity: int = 1,
+        model_path: Optional[str] = None,
+        delegate: str = "cpu",
+        tracking_only_frames: int = 0,
+        max_detect_width: int = 0
     ):
         """
         初始化检测器
@@ -151,30 +172,143 @@ class HandDetector:
             max_num_hands: 最大检测手数
             min_detection_confidence: 检测置信度阈值
             min_tracking_confidence: 追踪置信度阈值
-            model_complexity: 模型复杂度 (0=lite, 1=full)
+            model_complexity: 模型复杂度 (0=lite, 1=full，仅旧版 API 使用)
+            model_path: hand_landmarker.task 模型路径。提供且存在时
+                使用新版 Tasks API 的 LIVE_STREAM 模式（推理与采集重叠，
+                CPU 上约快一倍），否则回退到旧版 Solutions API
+            delegate: "gpu" 时 Tasks API 优先尝试 GPU 委托（不可用则
+                自动回落 CPU 委托），仅对 Tasks 路径生效
+            tracking_only_frames: >1 时每 K 帧只跑一次完整推理，
+                中间帧用 LK 光流平移上一帧关键点（省掉 K-1 次
+                MediaPipe 调用，手部平滑移动时精度损失很小）
+            max_detect_width: >0 且帧宽超过该值时，先 INTER_AREA 缩到
+                该宽度再送检测（模型输入本就只有 224x224，HD 帧白白
+                多付预处理带宽）；关键点是归一化坐标，像素坐标仍按
+                原始分辨率换算，绘制/光流不受影响
         """
         self.max_num_hands = max_num_hands
         self.min_detection_confidence = min_detection_confidence
         self.min_tracking_confidence = min_tracking_confidence
         self.model_complexity = model_complexity
+        self.tracking_only_frames = tracking_only_frames
 
         # 初始化 MediaPipe
         self._mp_hands = mp.solutions.hands
         self._mp_drawing = mp.solutions.drawing_utils
         self._mp_drawing_styles = mp.solutions.drawing_styles
 
-        # 创建检测器实例
-        self._hands = self._mp_hands.Hands(
-            static_image_mode=False,
+        # 新版 Tasks API 异步结果槽
+        self._hands = None
+        self._landmarker = None
+        self._use_tasks = False
+        self._result_lock = threading.Lock()
+        self._latest_tasks_result = None
+        self._last_ts_ms = 0
+
+        # 跳帧追踪状态（tracking_only_frames > 1 时使用）
+        self._frame_mod = 0
+        self._prev_gray: Optional[np.ndarray] = None
+        self._last_hands: List[HandLandmarks] = []
+
+        # 流水线推理（detect_pipelined 首次调用时创建工作线程）
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending_future: Optional[Future] = None
+
+        if model_path and os.path.exists(model_path):
+            try:
+                from mediapipe.tasks import python as mp_tasks
+                from mediapipe.tasks.python import vision as mp_vision
+
+                # GPU 委托可用时推理延迟可降 1.4-3 倍；创建失败
+                # （平台不支持/驱动缺失）则回落 CPU 委托
+                delegates = [mp_tasks.BaseOptions.Delegate.CPU]
+                if delegate == "gpu":
+                    delegates.insert(0, mp_tasks.BaseOptions.Delegate.GPU)
+
+                last_error = None
+                for dlg in delegates:
+                    try:
+                        options = mp_vision.HandLandmarkerOptions(
+                            base_options=mp_tasks.BaseOptions(
+                                model_asset_path=model_path,
+                                delegate=dlg),
+                            running_mode=mp_vision.RunningMode.LIVE_STREAM,
+                            num_hands=max_num_hands,
+                            min_hand_detection_confidence=min_detection_confidence,
+                            min_tracking_confidence=min_tracking_confidence,
+                            result_callback=self._on_tasks_result
+                        )
+                        self._landmarker = \
+                            mp_vision.HandLandmarker.create_from_options(options)
+                        self._use_tasks = True
+                        print(f"[INFO] 使用 MediaPipe Tasks HandLandmarker "
+                              f"(LIVE_STREAM, delegate={dlg.name})")
+                        break
+                    except Exception as e:
+                        last_error = e
+                        print(f"[WARN] {dlg.name} 委托初始化失败: {e}")
+
+                if not self._use_tasks and last_error is not None:
+                    raise last_error
+            except Exception as e:
+                print(f"[WARN] Tasks API 初始化失败，回退到旧版 Solutions: {e}")
+
+        if not self._use_tasks:
+            # 旧版 Solutions API（同步推理）
+            self._hands = self._mp_hands.Hands(
+                static_image_mode=False,
+                max_num_hands=max_num_hands,
+                min_detection_confidence=min_detection_confidence,
+                min_tracking_confidence=min_tracking_confidence,
+                model_complexity=model_complexity
+            )
+
+        # 手部追踪 ID 计数器
+        self._hand_counter = 0
+        self._prev_hands: Dict[str, np.ndarray] = {}
+
+        # 复用的图像缓冲：避免每帧 malloc 一块 HxWx3（分辨率变化时重建）
+        self._rgb_buf: Optional[np.ndarray] = None
+        self._output_buf: Optional[np.ndarray] = None
+        self.max_detect_width = max_detect_width
+        self._small_buf: Optional[np.ndarray] = None
+
+        # 按手指分组的骨架折线索引（含掌心横向连线），
+        # cv2.polylines 一次画完，代替逐条 cv2.line
+        self._bone_chains = [
+            np.array([0, 1, 2, 3, 4]),       # 大拇指
+            np.array([0, 5, 6, 7, 8]),       # 食指
+            np.array([0, 9, 10, 11, 12]),    # 中指
+            np.array([0, 13, 14, 15, 16]),   # 无名指
+            np.array([0, 17, 18, 19, 20]),   # 小指
+            np.array([5, 9, 13, 17]),        # 手掌横向连接
+        ]
+        self._tip_set = frozenset((4, 8, 12, 16, 20))
+
+    @classmethod
+    @functools.lru_cache(maxsize=4)
+    def get_shared(
+        cls,
+        max_num_hands: int = 2,
+        min_detection_confidence: float = 0.7,
+        min_tracking_confidence: float = 0.5,
+        model_complexity: int = 1
+    ) -> "HandDetector":
+        """
+        按参数共享的检测器实例
+
+        每个 MediaPipe 实例都会常驻一份模型内存，多摄像头/多连接
+        场景下应通过这里复用，而不是各自创建。共享实例不要调用
+        close()（进程退出时统一释放）
+        """
+        detector = cls(
             max_num_hands=max_num_hands,
             min_detection_confidence=min_detection_confidence,
             min_tracking_confidence=min_tracking_confidence,
             model_complexity=model_complexity
         )
-
-        # 手部追踪 ID 计数器
-        self._hand_counter = 0
-        self._prev_hands: Dict[str, np.ndarray] = {}
+        atexit.register(detector.close)
+        return detector
 
     def detect(
         self,
@@ -196,35 +330,97 @@ class HandDetector:
         import time
         start_time = time.time()
 
-        # 转换颜色空间 BGR -> RGB
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        # 跳帧模式：中间帧不跑 MediaPipe，用光流平移上一帧关键点
+        if self.tracking_only_frames > 1:
+            self._frame_mod = (self._frame_mod + 1) % self.tracking_only_frames
+            if (
+                self._frame_mod != 0
+                and self._last_hands
+                and self._prev_gray is not None
+            ):
+                return self._track_frame(image, frame_id, timestamp, start_time)
+
         image_height, image_width = image.shape[:2]
 
-        # MediaPipe 处理
-        results = self._hands.process(image_rgb)
+        # 超宽帧先缩小再检测（复用小图缓冲）；归一化坐标与原始分辨率
+        # 无关，后面的像素换算仍用原尺寸
+        detect_src = image
+        if self.max_detect_width and image_width > self.max_detect_width:
+            small_w = self.max_detect_width
+            small_h = max(1, round(image_height * small_w / image_width))
+            if (self._small_buf is None
+                    or self._small_buf.shape[:2] != (small_h, small_w)):
+                self._small_buf = np.empty(
+                    (small_h, small_w, 3), dtype=image.dtype)
+            cv2.resize(image, (small_w, small_h), dst=self._small_buf,
+                       interpolation=cv2.INTER_AREA)
+            detect_src = self._small_buf
+
+        # 转换颜色空间 BGR -> RGB：通道翻转就是一次带重排的 memcpy，
+        # np.copyto 写入复用缓冲，单趟完成且跳过 OpenCV 调度器
+        if self._rgb_buf is None or self._rgb_buf.shape != detect_src.shape:
+            self._rgb_buf = np.empty_like(detect_src)
+        np.copyto(self._rgb_buf, detect_src[..., ::-1])
+        image_rgb = self._rgb_buf
+
+        # MediaPipe 处理：统一成 (手性, 置信度, 关键点序列) 列表，
+        # 两套 API 共用后面的构建逻辑
+        if self._use_tasks:
+            # LIVE_STREAM 模式异步推理：提交当前帧，取回最近完成的结果
+            # （晚一帧返回，但推理与采集/后处理重叠，吞吐更高）
+            mp_image = mp.Image(
+                image_format=mp.ImageFormat.SRGB, data=image_rgb)
+            # 时间戳必须严格递增（毫秒）
+            ts_ms = int(timestamp)
+            if ts_ms <= self._last_ts_ms:
+                ts_ms = self._last_ts_ms + 1
+            self._last_ts_ms = ts_ms
+            self._landmarker.detect_async(mp_image, ts_ms)
+
+            with self._result_lock:
+                result = self._latest_tasks_result
+
+            detected = []
+            if result:
+                for lm_list, categories in zip(
+                    result.hand_landmarks, result.handedness
+                ):
+                    detected.append((
+                        categories[0].category_name,
+                        categories[0].score,
+                        lm_list
+                    ))
+        else:
+            results = self._hands.process(image_rgb)
+            detected = []
+            if results.multi_hand_landmarks and results.multi_handedness:
+                for hand_landmarks, handedness_info in zip(
+                    results.multi_hand_landmarks,
+                    results.multi_handedness
+                ):
+                    detected.append((
+                        handedness_info.classification[0].label,
+                        handedness_info.classification[0].score,
+                        hand_landmarks.landmark
+                    ))
 
         hands = []
-
-        if results.multi_hand_landmarks and results.multi_handedness:
-            for hand_landmarks, handedness_info in zip(
-                results.multi_hand_landmarks,
-                results.multi_handedness
-            ):
-                # 提取手性信息
-                handedness = handedness_info.classification[0].label
-                confidence = handedness_info.classification[0].score
-
-                # 提取 21 个关键点
-                landmarks = np.array([
-                    [lm.x, lm.y, lm.z]
-                    for lm in hand_landmarks.landmark
-                ])
-
-                # 计算像素坐标
-                landmarks_pixel = np.array([
-                    [int(lm.x * image_width), int(lm.y * image_height)]
-                    for lm in hand_landmarks.landmark
-                ])
+        px_scale = np.array([image_width, image_height], dtype=np.float32)
+
+        if detected:
+            for handedness, confidence, landmark_seq in detected:
+                # 提取 21 个关键点：单次遍历填入预分配 float32 数组，
+                # 避免列表推导的中间 list 和逐点 Python 对象装箱
+                landmarks = np.empty((21, 3), dtype=np.float32)
+                for i, lm in enumerate(landmark_seq):
+                    landmarks[i, 0] = lm.x
+                    landmarks[i, 1] = lm.y
+                    landmarks[i, 2] = lm.z
+
+                # 像素坐标：一次向量乘法代替 42 次 int() 逐点转换
+                landmarks_pixel = (
+                    landmarks[:, :2] * px_scale
+                ).astype(np.int32)
 
                 # 生成手部 ID（基于手性和位置）
                 hand_id = self._assign_hand_id(handedness, landmarks)
@@ -233,6 +429,9 @@ class HandDetector:
                     hand_id=hand_id,
                     handedness=handedness,
                     landmarks=landmarks,
+                    # 手势逻辑大多只用 XY 平面：提前切出连续数组，
+                    # 免去下游每次 [:2] 产生的小视图对象
+                    landmarks_xy=np.ascontiguousarray(landmarks[:, :2]),
                     landmarks_pixel=landmarks_pixel,
                     confidence=confidence,
                     image_width=image_width,
@@ -240,6 +439,11 @@ class HandDetector:
                 )
                 hands.append(hand)
 
+        # 记录跳帧追踪所需的参考帧
+        if self.tracking_only_frames > 1:
+            self._prev_gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            self._last_hands = hands
+
         inference_time = (time.time() - start_time) * 1000
 
         return DetectionResult(
@@ -249,6 +453,90 @@ class HandDetector:
             inference_time_ms=inference_time
         )
 
+    def _track_frame(
+        self,
+        image: np.ndarray,
+        frame_id: int,
+        timestamp: float,
+        start_time: float
+    ) -> DetectionResult:
+        """跳帧追踪：用 LK 光流把上一帧关键点平移到当前帧"""
+        import time
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        hands = []
+        for prev in self._last_hands:
+            pts = prev.landmarks_pixel.astype(np.float32).reshape(-1, 1, 2)
+            new_pts, status, _ = cv2.calcOpticalFlowPyrLK(
+                self._prev_gray, gray, pts, None)
+
+            # 任何一个点跟丢就放弃这只手，等下一次完整推理找回
+            if new_pts is None or not status.all():
+                continue
+
+            new_px = new_pts.reshape(-1, 2)
+            landmarks = prev.landmarks.copy()
+            landmarks[:, 0] = new_px[:, 0] / prev.image_width
+            landmarks[:, 1] = new_px[:, 1] / prev.image_height
+
+            hands.append(HandLandmarks(
+                hand_id=prev.hand_id,
+                handedness=prev.handedness,
+                landmarks=landmarks,
+                landmarks_xy=np.ascontiguousarray(landmarks[:, :2]),
+                landmarks_pixel=new_px.astype(np.int32),
+                confidence=prev.confidence,
+                image_width=prev.image_width,
+                image_height=prev.image_height
+            ))
+
+        self._prev_gray = gray
+        self._last_hands = hands
+
+        return DetectionResult(
+            hands=hands,
+            frame_id=frame_id,
+            timestamp=timestamp,
+            inference_time_ms=(time.time() - start_time) * 1000
+        )
+
+    def detect_pipelined(
+        self,
+        image: np.ndarray,
+        frame_id: int = 0,
+        timestamp: float = 0.0
+    ) -> Optional[DetectionResult]:
+        """
+        流水线检测：把当前帧提交到推理线程，返回上一帧的结果
+
+        推理与采集/绘制重叠执行，多核 CPU 上端到端帧率接近翻倍；
+        代价是结果晚一帧。单工作线程保证内部复用缓冲的串行访问。
+
+        Args:
+            image: BGR 格式图像
+            frame_id: 帧序号
+            timestamp: 时间戳
+
+        Returns:
+            上一帧的 DetectionResult，首帧返回 None
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="hand-infer")
+
+        future = self._executor.submit(self.detect, image, frame_id, timestamp)
+        prev = self._pending_future
+        self._pending_future = future
+
+        if prev is None:
+            return None
+        return prev.result()
+
+    def _on_tasks_result(self, result, output_image, timestamp_ms: int):
+        """Tasks API 异步结果回调（在 MediaPipe 内部线程调用）"""
+        with self._result_lock:
+            self._latest_tasks_result = result
+
     def _assign_hand_id(self, handedness: str, landmarks: np.ndarray) -> str:
         """
         分配手部 ID
@@ -264,7 +552,8 @@ class HandDetector:
         draw_connections: bool = True,
         color: Tuple[int, int, int] = (0, 255, 255),  # 青色
         thickness: int = 2,
-        circle_radius: int = 4
+        circle_radius: int = 4,
+        in_place: bool = False
     ) -> np.ndarray:
         """
         在图像上绘制手部关键点
@@ -276,24 +565,33 @@ class HandDetector:
             color: 颜色 (BGR)
             thickness: 线条粗细
             circle_radius: 关键点圆圈半径
+            in_place: 直接画在传入图像上（调用方确认 image 是
+                草稿缓冲时可省去整幅拷贝）
 
         Returns:
             绘制后的图像
         """
-        output = image.copy()
+        if in_place:
+            output = image
+        else:
+            # 拷贝到复用缓冲再绘制，不每帧新分配输出图像
+            if self._output_buf is None or self._output_buf.shape != image.shape:
+                self._output_buf = np.empty_like(image)
+            output = self._output_buf
+            np.copyto(output, image)
 
         for hand in result.hands:
-            # 绘制连线
+            # 绘制连线（分组折线批量提交，23 次 line 调用降到 1 次）
             if draw_connections:
-                for start_idx, end_idx in HAND_CONNECTIONS:
-                    start_point = tuple(hand.landmarks_pixel[start_idx])
-                    end_point = tuple(hand.landmarks_pixel[end_idx])
-                    cv2.line(output, start_point, end_point, color, thickness)
+                pts = [
+                    hand.landmarks_pixel[chain].reshape(-1, 1, 2)
+                    for chain in self._bone_chains
+                ]
+                cv2.polylines(output, pts, False, color, thickness)
 
-            # 绘制关键点
+            # 绘制关键点（指尖用不同颜色）
             for i, point in enumerate(hand.landmarks_pixel):
-                # 指尖用不同颜色
-                if i in [4, 8, 12, 16, 20]:
+                if i in self._tip_set:
                     point_color = (0, 255, 0)  # 绿色
                     radius = circle_radius + 2
                 else:
@@ -312,7 +610,14 @@ class HandDetector:
 
     def close(self):
         """释放资源"""
-        self._hands.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._pending_future = None
+        if self._landmarker is not None:
+            self._landmarker.close()
+        if self._hands is not None:
+            self._hands.close()
 
     def __enter__(self):
         return self
@@ -338,7 +643,7 @@ if __name__ == "__main__":
             )
 
             # 绘制结果
-            output = detector.draw_landmarks(frame.image, result)
+            output = detector.draw_landmarks(frame.image, result, in_place=True)
 
             # 显示信息
             info_text = f"Hands: {result.num_hands} | Inference: {result.inference_time_ms:.1f}ms"
@@ -4,13 +4,21 @@
 """
 
 import numpy as np
-from typing import Dict, Optional, Tuple
-from dataclasses import dataclass
+from typing import Dict, NamedTuple, Optional, Tuple
 from enum import Enum
 import math
 
 from .detector import HandLandmarks, LandmarkIndex, FINGER_INDICES
 
+# Numba 可选：装了就把整个分类核 JIT 成单个 nopython 内核
+# （21 个点的小数组上 NumPy 调度开销远大于浮点量，JIT 后快一个量级），
+# 没装则走向量化 NumPy 路径
+try:
+    from numba import njit as _njit
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
 
 class GestureType(Enum):
     """手势类型枚举"""
@@ -24,12 +32,57 @@ class GestureType(Enum):
     THUMBS_UP = "thumbs_up" # 竖大拇指
 
 
-@dataclass
 class GestureProba:
-    """手势概率分布"""
-    probabilities: Dict[str, float]
-    dominant_gesture: str
-    dominant_score: float
+    """
+    手势概率分布
+
+    内部以定长 float32 得分向量存储（顺序见 _CORE_GESTURES），
+    probabilities 字典只在被访问时物化，热路径不再每帧重建 dict
+    """
+
+    __slots__ = ("_scores", "_probabilities", "dominant_gesture", "dominant_score")
+
+    def __init__(
+        self,
+        probabilities: Optional[Dict[str, float]] = None,
+        dominant_gesture: str = "idle",
+        dominant_score: float = 0.0,
+        scores: Optional[np.ndarray] = None
+    ):
+        self._probabilities = probabilities
+        self._scores = scores
+        self.dominant_gesture = dominant_gesture
+        self.dominant_score = dominant_score
+
+    @property
+    def probabilities(self) -> Dict[str, float]:
+        """概率字典（首次访问时从得分向量物化）"""
+        if self._probabilities is None:
+            sc = self._scores
+            self._probabilities = {
+                name: float(sc[i]) for i, name in enumerate(_CORE_GESTURES)
+            }
+        return self._probabilities
+
+    @property
+    def scores(self) -> Optional[np.ndarray]:
+        """原始得分向量（可能为 None，按 _CORE_GESTURES 顺序）"""
+        return self._scores
+
+    @property
+    def vector(self) -> Optional[np.ndarray]:
+        """按类别下标索引的得分向量（scores 的别名，下游按下标消费）"""
+        return self._scores
+
+    @classmethod
+    def from_scores(cls, scores: np.ndarray) -> "GestureProba":
+        """从定长得分向量创建（argmax 找主导手势，不建字典）"""
+        idx = int(scores.argmax())
+        return cls(
+            scores=scores,
+            dominant_gesture=_CORE_GESTURES[idx],
+            dominant_score=float(scores[idx])
+        )
 
     @classmethod
     def from_dict(cls, proba_dict: Dict[str, float]) -> "GestureProba":
@@ -45,6 +98,228 @@ class GestureProba:
         )
 
 
+# 各评分函数用到的固定手指组合（模块级元组，避免每帧重建 list）
+_NON_THUMB_FINGERS = ("index", "middle", "ring", "pinky")
+_OTHER_FINGERS = ("middle", "ring", "pinky")
+_VICTORY_OTHERS = ("ring", "pinky")
+
+
+# _classify_core / GestureProba.scores 的手势顺序（供下游按下标对齐）
+GESTURE_SCORE_ORDER = (
+    "open", "fist", "pinch", "point", "victory", "ok", "thumbs_up", "idle"
+)
+_CORE_GESTURES = GESTURE_SCORE_ORDER
+
+
+def _classify_core(
+    lm: np.ndarray,
+    cos_extended: float,
+    pinch_ratio: float,
+    fist_ratio: float,
+    open_ratio: float,
+) -> np.ndarray:
+    """
+    规则分类核：纯标量算术，从 21x3 关键点直接算出归一化手势得分
+
+    与 GestureClassifier 的向量化路径逻辑一致，但写成 nopython
+    友好的展开形式，装有 Numba 时整体 JIT 成一个内核
+    """
+    out = np.zeros(8, dtype=np.float32)
+
+    # hand_scale：食指 MCP 到小指 MCP 的平面距离
+    dx = lm[5, 0] - lm[17, 0]
+    dy = lm[5, 1] - lm[17, 1]
+    hand_scale = math.sqrt(dx * dx + dy * dy)
+    if hand_scale < 0.001:
+        out[7] = 1.0
+        return out
+    inv_scale = 1.0 / hand_scale
+
+    # 手掌中心（MCP 平均）
+    pcx = (lm[5, 0] + lm[9, 0] + lm[13, 0] + lm[17, 0]) * 0.25
+    pcy = (lm[5, 1] + lm[9, 1] + lm[13, 1] + lm[17, 1]) * 0.25
+
+    # 大拇指伸展：tip 比 MCP 离掌心更远
+    dx = lm[4, 0] - pcx
+    dy = lm[4, 1] - pcy
+    tip_dist = math.sqrt(dx * dx + dy * dy)
+    dx = lm[1, 0] - pcx
+    dy = lm[1, 1] - pcy
+    mcp_dist = math.sqrt(dx * dx + dy * dy)
+    thumb_ext = tip_dist > mcp_dist * 1.2
+
+    # 其余四指：余弦域夹角判定（index/middle/ring/pinky）
+    tips = (8, 12, 16, 20)
+    pips = (6, 10, 14, 18)
+    mcps = (5, 9, 13, 17)
+    ext0 = False
+    ext1 = False
+    ext2 = False
+    ext3 = False
+    for i in range(4):
+        t = tips[i]
+        p = pips[i]
+        m = mcps[i]
+        v1x = lm[t, 0] - lm[p, 0]
+        v1y = lm[t, 1] - lm[p, 1]
+        v1z = lm[t, 2] - lm[p, 2]
+        v2x = lm[m, 0] - lm[p, 0]
+        v2y = lm[m, 1] - lm[p, 1]
+        v2z = lm[m, 2] - lm[p, 2]
+        dot = v1x * v2x + v1y * v2y + v1z * v2z
+        n1 = math.sqrt(v1x * v1x + v1y * v1y + v1z * v1z)
+        n2 = math.sqrt(v2x * v2x + v2y * v2y + v2z * v2z)
+        is_ext = dot / (n1 * n2 + 1e-6) < cos_extended
+        if i == 0:
+            ext0 = is_ext
+        elif i == 1:
+            ext1 = is_ext
+        elif i == 2:
+            ext2 = is_ext
+        else:
+            ext3 = is_ext
+    ext_count = int(ext0) + int(ext1) + int(ext2) + int(ext3)
+
+    # 共享距离特征（均已除以 hand_scale）
+    spread_sum = 0.0
+    all_tips = (4, 8, 12, 16, 20)
+    for i in range(4):
+        a = all_tips[i]
+        b = all_tips[i + 1]
+        dx = lm[a, 0] - lm[b, 0]
+        dy = lm[a, 1] - lm[b, 1]
+        spread_sum += math.sqrt(dx * dx + dy * dy)
+    avg_tip_spread = spread_sum * 0.25 * inv_scale
+
+    wrist_sum = 0.0
+    for i in range(4):
+        t = tips[i]
+        dx = lm[t, 0] - lm[0, 0]
+        dy = lm[t, 1] - lm[0, 1]
+        wrist_sum += math.sqrt(dx * dx + dy * dy)
+    avg_tip_wrist = wrist_sum * 0.25 * inv_scale
+
+    dx = lm[4, 0] - lm[8, 0]
+    dy = lm[4, 1] - lm[8, 1]
+    thumb_index = math.sqrt(dx * dx + dy * dy) * inv_scale
+
+    # 1. open
+    extension_score = (int(thumb_ext) + ext_count) / 5.0
+    spread_score = min(avg_tip_spread / open_ratio, 1.0)
+    out[0] = extension_score * 0.6 + spread_score * 0.4
+
+    # 2. fist
+    bent_score = (4 - ext_count) / 4.0
+    distance_score = max(0.0, 1.0 - avg_tip_wrist / fist_ratio)
+    out[1] = bent_score * 0.5 + distance_score * 0.5
+
+    # 3. pinch
+    pinch_dist_score = max(0.0, 1.0 - thumb_index / pinch_ratio)
+    other_bent = 3 - (int(ext1) + int(ext2) + int(ext3))
+    out[2] = pinch_dist_score * 0.7 + (other_bent / 3.0) * 0.3
+
+    # 4. point
+    if ext0:
+        out[3] = (other_bent / 3.0) * 0.7 + 0.3
+
+    # 5. victory
+    if ext0 and ext1:
+        dx = lm[8, 0] - lm[12, 0]
+        dy = lm[8, 1] - lm[12, 1]
+        spread = math.sqrt(dx * dx + dy * dy)
+        dx = lm[5, 0] - lm[9, 0]
+        dy = lm[5, 1] - lm[9, 1]
+        base_spread = math.sqrt(dx * dx + dy * dy)
+        if spread / (base_spread + 1e-6) >= 1.5:
+            others_bent2 = 2 - (int(ext2) + int(ext3))
+            out[4] = (others_bent2 / 2.0) * 0.5 + 0.5
+
+    # 6. ok
+    circle_score = max(0.0, 1.0 - thumb_index / 0.2)
+    others_ext = int(ext1) + int(ext2) + int(ext3)
+    out[5] = circle_score * 0.6 + (others_ext / 3.0) * 0.4
+
+    # 7. thumbs_up
+    if thumb_ext:
+        out[6] = ((4 - ext_count) / 4.0) * 0.7 + 0.3
+
+    # 归一化（与 _normalize_scores 相同的 idle 补偿逻辑）
+    total = 0.0
+    for i in range(7):
+        total += out[i]
+    if total < 0.001:
+        for i in range(7):
+            out[i] = 0.0
+        out[7] = 1.0
+        return out
+
+    max_score = 0.0
+    for i in range(7):
+        out[i] /= total
+        if out[i] > max_score:
+            max_score = out[i]
+
+    if max_score < 0.3:
+        out[7] = 1.0 - max_score
+        total = 1.0 + out[7]
+        for i in range(8):
+            out[i] /= total
+
+    return out
+
+
+# _slide_core 的方向编码 -> 方向名（0 表示未构成滑动）
+_SLIDE_DIRS = (None, "left", "right", "up", "down")
+
+
+def _slide_core(
+    buf: np.ndarray,
+    idx: int,
+    count: int,
+    min_distance: float,
+    max_z_change: float,
+):
+    """
+    滑动判定核：从环形缓冲的最旧/最新两帧算位移与方向
+
+    返回 (方向编码, XY 位移)，编码见 _SLIDE_DIRS；
+    纯标量算术，装有 Numba 时与分类核一样整体 JIT
+    """
+    start = buf[(idx - count) % 10]
+    end = buf[idx - 1]
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+    dz = end[2] - start[2]
+
+    if abs(dz) > max_z_change:
+        return 0, 0.0
+
+    dist = math.sqrt(dx * dx + dy * dy)
+    if dist < min_distance:
+        return 0, 0.0
+
+    if abs(dx) > abs(dy):
+        if dx > 0:
+            return 2, dist
+        return 1, dist
+    if dy > 0:
+        return 4, dist
+    return 3, dist
+
+
+if _HAS_NUMBA:
+    _classify_core = _njit(cache=True, fastmath=True)(_classify_core)
+    _slide_core = _njit(cache=True, fastmath=True)(_slide_core)
+
+
+class _HandFeatures(NamedTuple):
+    """classify 一次算好、各评分函数共享的几何特征（已按 hand_scale 归一）"""
+    finger_states: Dict[str, bool]   # 各手指伸展状态
+    avg_tip_spread: float            # 相邻指尖平均间距
+    avg_tip_wrist: float             # 四指指尖到手腕的平均距离
+    thumb_index_dist: float          # 拇指-食指指尖距离
+
+
 class GestureClassifier:
     """
     手势分类器
@@ -69,10 +344,40 @@ class GestureClassifier:
         self.fist_tip_wrist_ratio = fist_tip_wrist_ratio
         self.open_spread_ratio = open_spread_ratio
 
-        # 滑动检测状态
+        # 滑动检测状态：每只手一个 (10,3) 环形缓冲 [buf, 写指针, 计数]，
+        # O(1) 写入，不再用 list.pop(0) 整体搬移
         self._prev_positions: Dict[str, np.ndarray] = {}
         self._position_history: Dict[str, list] = {}
 
+        # classify_batch 复用的 (H, 8) 得分矩阵
+        self._batch_scores: Optional[np.ndarray] = None
+
+        # 四根非拇指手指的关节索引（预构建，手指角度一次向量化算完）
+        self._all_tip_idx = np.array([4, 8, 12, 16, 20])
+        self._tip_idx = np.array([8, 12, 16, 20])
+        self._pip_idx = np.array([6, 10, 14, 18])
+        self._mcp_idx = np.array([5, 9, 13, 17])
+
+        # acos 在 [0, π] 上单调递减，angle > 阈值 等价于 cos < cos(阈值)，
+        # 预算好阈值余弦后热路径无需反余弦
+        self._cos_extended = math.cos(finger_extended_angle)
+
+        # 阈值在构造后即固定，预先打包成内核参数元组：
+        # 热路径每次调用只做一次属性查找，其余全走局部解包
+        self._core_args = (
+            self._cos_extended,
+            self.pinch_distance_ratio,
+            self.fist_tip_wrist_ratio,
+            self.open_spread_ratio,
+        )
+
+    def warmup(self):
+        """预热分类核：触发 Numba JIT 编译，未装 Numba 时为空操作"""
+        if not _HAS_NUMBA:
+            return
+        _classify_core(np.zeros((21, 3), dtype=np.float32), *self._core_args)
+        _slide_core(np.zeros((10, 3), dtype=np.float32), 5, 5, 0.1, 0.05)
+
     def classify(self, hand: HandLandmarks) -> GestureProba:
         """
         对手部关键点进行手势分类
@@ -83,189 +388,192 @@ class GestureClassifier:
         Returns:
             GestureProba 手势概率分布
         """
-        lm = hand.landmarks
-        hand_scale = hand.hand_scale
-
-        # 避免除零
-        if hand_scale < 0.001:
-            return GestureProba.from_dict({"idle": 1.0})
-
-        # 计算各手指伸展状态
-        finger_states = self._get_finger_states(lm)
+        return GestureProba.from_scores(self._score_vector(hand))
 
-        # 计算各手势的概率/得分
-        proba = {}
-
-        # 1. 张开手掌检测
-        proba["open"] = self._calc_open_score(lm, finger_states, hand_scale)
+    def classify_batch(self, hands) -> np.ndarray:
+        """
+        对一帧内的所有手批量分类
 
-        # 2. 握拳检测
-        proba["fist"] = self._calc_fist_score(lm, finger_states, hand_scale)
+        Args:
+            hands: HandLandmarks 序列
 
-        # 3. 捏合检测
-        proba["pinch"] = self._calc_pinch_score(lm, finger_states, hand_scale)
+        Returns:
+            (H, 8) float32 得分矩阵，行序与 hands 对应，
+            列序为 GESTURE_SCORE_ORDER；矩阵缓冲逐帧复用，
+            需要跨帧保留时自行拷贝
+        """
+        n = len(hands)
+        buf = self._batch_scores
+        if buf is None or buf.shape[0] < n:
+            buf = self._batch_scores = np.empty((max(n, 2), 8), dtype=np.float32)
+        for i, hand in enumerate(hands):
+            buf[i] = self._score_vector(hand)
+        return buf[:n]
+
+    def _score_vector(self, hand: HandLandmarks) -> np.ndarray:
+        """计算单手的定长得分向量（classify / classify_batch 共用）"""
+        lm = hand.landmarks
 
-        # 4. 指向检测
-        proba["point"] = self._calc_point_score(lm, finger_states)
+        # Numba 可用时整个分类在一个 JIT 内核里完成；
+        # 内核按参数类型特化编译，效果等同把阈值内联成字面量
+        if _HAS_NUMBA:
+            return _classify_core(lm, *self._core_args)
 
-        # 5. 剪刀手/V手势检测
-        proba["victory"] = self._calc_victory_score(lm, finger_states)
+        # 避免除零（平方量比较，退化情形连开方都不用做）
+        if hand.hand_scale_sq < 1e-6:
+            scores = np.zeros(8, dtype=np.float32)
+            scores[7] = 1.0  # idle
+            return scores
 
-        # 6. OK手势检测
-        proba["ok"] = self._calc_ok_score(lm, finger_states, hand_scale)
+        hand_scale = hand.hand_scale
 
-        # 7. 竖大拇指检测
-        proba["thumbs_up"] = self._calc_thumbs_up_score(lm, finger_states)
+        # 共享特征一次算好：各评分函数此前重复遍历同一个 21x3 数组
+        # （指尖间距、指尖-手腕距离、拇指-食指距离各算一遍），
+        # 现在指尖坐标只取一次，距离全部向量化
+        lm_xy = hand.landmarks_xy
+        finger_states = self._get_finger_states(lm, lm_xy, hand.palm_center)
+
+        tips = lm_xy[self._all_tip_idx]
+        adj_dists = np.linalg.norm(np.diff(tips, axis=0), axis=1)
+        wrist_dists = np.linalg.norm(tips[1:] - lm_xy[0], axis=1)
+
+        # 除法只做一次，其余用乘法
+        inv_scale = 1.0 / hand_scale
+        feats = _HandFeatures(
+            finger_states=finger_states,
+            avg_tip_spread=float(adj_dists.mean()) * inv_scale,
+            avg_tip_wrist=float(wrist_dists.mean()) * inv_scale,
+            thumb_index_dist=float(np.linalg.norm(tips[0] - tips[1])) * inv_scale,
+        )
 
-        # 归一化（使用 softmax 风格的归一化）
-        proba = self._normalize_scores(proba)
+        # 各手势得分写入定长向量（顺序与 _CORE_GESTURES 一致），
+        # 不再每帧构建/重建概率字典
+        scores = np.empty(8, dtype=np.float32)
+        scores[0] = self._calc_open_score(feats)
+        scores[1] = self._calc_fist_score(feats)
+        scores[2] = self._calc_pinch_score(feats)
+        scores[3] = self._calc_point_score(feats)
+        scores[4] = self._calc_victory_score(lm_xy, feats)
+        scores[5] = self._calc_ok_score(feats)
+        scores[6] = self._calc_thumbs_up_score(feats)
+        scores[7] = 0.0  # idle
+
+        # 归一化（同原 _normalize_scores 的 idle 补偿逻辑，向量化）
+        total = float(scores[:7].sum())
+        if total < 0.001:
+            scores[:7] = 0.0
+            scores[7] = 1.0
+        else:
+            scores[:7] /= total
+            max_score = float(scores[:7].max())
+            if max_score < 0.3:
+                scores[7] = 1.0 - max_score
+                scores /= 1.0 + scores[7]
 
-        return GestureProba.from_dict(proba)
+        return scores
 
-    def _get_finger_states(self, lm: np.ndarray) -> Dict[str, bool]:
+    def _get_finger_states(
+        self, lm: np.ndarray, lm_xy: np.ndarray, palm_center: np.ndarray
+    ) -> Dict[str, bool]:
         """
         判断每个手指的伸展状态
 
+        Args:
+            lm: 21x3 关键点数组
+            lm_xy: 21x2 平面坐标（HandLandmarks 上已切好的连续数组）
+            palm_center: 手掌中心（HandLandmarks 上已缓存，不再重算）
+
         Returns:
             字典，键为手指名，值为是否伸展
         """
-        states = {}
-
-        for finger_name, indices in FINGER_INDICES.items():
-            tip_idx, dip_idx, pip_idx, mcp_idx = indices
-
-            if finger_name == "thumb":
-                # 大拇指使用不同的判断方式
-                # 比较 tip 到手掌中心的距离
-                palm_center = np.mean(lm[[5, 9, 13, 17]], axis=0)
-                tip_dist = np.linalg.norm(lm[tip_idx][:2] - palm_center[:2])
-                mcp_dist = np.linalg.norm(lm[mcp_idx][:2] - palm_center[:2])
-                states[finger_name] = tip_dist > mcp_dist * 1.2
-            else:
-                # 其他手指：比较 tip-pip 和 mcp-pip 向量的夹角
-                v1 = lm[tip_idx] - lm[pip_idx]
-                v2 = lm[mcp_idx] - lm[pip_idx]
-
-                # 计算夹角
-                cos_angle = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2) + 1e-6)
-                cos_angle = np.clip(cos_angle, -1, 1)
-                angle = math.acos(cos_angle)
-
-                # 伸直时夹角接近 π（180度）
-                states[finger_name] = angle > self.finger_extended_angle
-
-        return states
-
-    def _calc_open_score(
-        self,
-        lm: np.ndarray,
-        finger_states: Dict[str, bool],
-        hand_scale: float
-    ) -> float:
+        # 大拇指使用不同的判断方式：比较 tip 到手掌中心的距离
+        pc_xy = palm_center[:2]
+        tip_dist = np.linalg.norm(lm_xy[4] - pc_xy)
+        mcp_dist = np.linalg.norm(lm_xy[1] - pc_xy)
+        thumb_extended = tip_dist > mcp_dist * 1.2
+
+        # 其余四指：tip-pip 和 mcp-pip 的夹角，一次向量化算完
+        # （伸直时夹角接近 π，即 180 度）
+        v1 = lm[self._tip_idx] - lm[self._pip_idx]
+        v2 = lm[self._mcp_idx] - lm[self._pip_idx]
+        cos_angle = np.einsum('ij,ij->i', v1, v2) / (
+            np.linalg.norm(v1, axis=1) * np.linalg.norm(v2, axis=1) + 1e-6
+        )
+        # 直接在余弦域比较，省掉 arccos 和 clip
+        extended = cos_angle < self._cos_extended
+
+        return {
+            "thumb": thumb_extended,
+            "index": bool(extended[0]),
+            "middle": bool(extended[1]),
+            "ring": bool(extended[2]),
+            "pinky": bool(extended[3]),
+        }
+
+    def _calc_open_score(self, feats: _HandFeatures) -> float:
         """计算张开手掌的得分"""
         # 所有手指都要伸展
-        extended_count = sum(finger_states.values())
-
-        # 计算指尖间距
-        tips = [4, 8, 12, 16, 20]
-        spread_distances = []
-        for i in range(len(tips) - 1):
-            dist = np.linalg.norm(lm[tips[i]][:2] - lm[tips[i+1]][:2])
-            spread_distances.append(dist / hand_scale)
-
-        avg_spread = np.mean(spread_distances)
+        extended_count = sum(feats.finger_states.values())
 
         # 综合评分
         extension_score = extended_count / 5.0
-        spread_score = min(avg_spread / self.open_spread_ratio, 1.0)
+        spread_score = min(feats.avg_tip_spread / self.open_spread_ratio, 1.0)
 
         return extension_score * 0.6 + spread_score * 0.4
 
-    def _calc_fist_score(
-        self,
-        lm: np.ndarray,
-        finger_states: Dict[str, bool],
-        hand_scale: float
-    ) -> float:
+    def _calc_fist_score(self, feats: _HandFeatures) -> float:
         """计算握拳的得分"""
         # 除大拇指外的手指都要弯曲
-        bent_fingers = ["index", "middle", "ring", "pinky"]
-        bent_count = sum(1 for f in bent_fingers if not finger_states[f])
-
-        # 计算指尖到手腕的距离
-        wrist = lm[LandmarkIndex.WRIST][:2]
-        tip_indices = [8, 12, 16, 20]
-        tip_distances = []
-        for idx in tip_indices:
-            dist = np.linalg.norm(lm[idx][:2] - wrist) / hand_scale
-            tip_distances.append(dist)
-
-        avg_tip_dist = np.mean(tip_distances)
+        finger_states = feats.finger_states
+        bent_count = sum(1 for f in _NON_THUMB_FINGERS if not finger_states[f])
 
         # 综合评分
         bent_score = bent_count / 4.0
-        distance_score = max(0, 1.0 - avg_tip_dist / self.fist_tip_wrist_ratio)
+        distance_score = max(0, 1.0 - feats.avg_tip_wrist / self.fist_tip_wrist_ratio)
 
         return bent_score * 0.5 + distance_score * 0.5
 
-    def _calc_pinch_score(
-        self,
-        lm: np.ndarray,
-        finger_states: Dict[str, bool],
-        hand_scale: float
-    ) -> float:
+    def _calc_pinch_score(self, feats: _HandFeatures) -> float:
         """计算捏合的得分"""
-        # 拇指和食指指尖距离
-        thumb_tip = lm[LandmarkIndex.THUMB_TIP][:2]
-        index_tip = lm[LandmarkIndex.INDEX_TIP][:2]
-        pinch_dist = np.linalg.norm(thumb_tip - index_tip) / hand_scale
-
-        # 距离越小得分越高
-        distance_score = max(0, 1.0 - pinch_dist / self.pinch_distance_ratio)
+        # 拇指和食指指尖距离越小得分越高
+        distance_score = max(
+            0, 1.0 - feats.thumb_index_dist / self.pinch_distance_ratio)
 
         # 其他手指状态（中指、无名指、小指弯曲则更可能是捏合）
-        other_bent = sum(1 for f in ["middle", "ring", "pinky"] if not finger_states[f])
+        finger_states = feats.finger_states
+        other_bent = sum(1 for f in _OTHER_FINGERS if not finger_states[f])
         other_score = other_bent / 3.0
 
         return distance_score * 0.7 + other_score * 0.3
 
-    def _calc_point_score(
-        self,
-        lm: np.ndarray,
-        finger_states: Dict[str, bool]
-    ) -> float:
+    def _calc_point_score(self, feats: _HandFeatures) -> float:
         """计算指向的得分"""
         # 食指伸展，其他手指弯曲
+        finger_states = feats.finger_states
         index_extended = finger_states["index"]
-        others_bent = sum(1 for f in ["middle", "ring", "pinky"] if not finger_states[f])
+        others_bent = sum(1 for f in _OTHER_FINGERS if not finger_states[f])
 
         if not index_extended:
             return 0.0
 
         return (others_bent / 3.0) * 0.7 + 0.3
 
-    def _calc_victory_score(
-        self,
-        lm: np.ndarray,
-        finger_states: Dict[str, bool]
-    ) -> float:
+    def _calc_victory_score(self, lm_xy: np.ndarray, feats: _HandFeatures) -> float:
         """计算剪刀手/V手势的得分"""
         # 食指和中指伸展，其他弯曲
+        finger_states = feats.finger_states
         index_extended = finger_states["index"]
         middle_extended = finger_states["middle"]
-        others_bent = sum(1 for f in ["ring", "pinky"] if not finger_states[f])
+        others_bent = sum(1 for f in _VICTORY_OTHERS if not finger_states[f])
 
         if not (index_extended and middle_extended):
             return 0.0
 
         # 检查食指和中指是否分开
-        index_tip = lm[LandmarkIndex.INDEX_TIP][:2]
-        middle_tip = lm[LandmarkIndex.MIDDLE_TIP][:2]
-        spread = np.linalg.norm(index_tip - middle_tip)
-
-        index_mcp = lm[LandmarkIndex.INDEX_MCP][:2]
-        middle_mcp = lm[LandmarkIndex.MIDDLE_MCP][:2]
-        base_spread = np.linalg.norm(index_mcp - middle_mcp)
+        spread = np.linalg.norm(
+            lm_xy[LandmarkIndex.INDEX_TIP] - lm_xy[LandmarkIndex.MIDDLE_TIP])
+        base_spread = np.linalg.norm(
+            lm_xy[LandmarkIndex.INDEX_MCP] - lm_xy[LandmarkIndex.MIDDLE_MCP])
 
         spread_ratio = spread / (base_spread + 1e-6)
 
@@ -274,63 +582,33 @@ class GestureClassifier:
 
         return (others_bent / 2.0) * 0.5 + 0.5
 
-    def _calc_ok_score(
-        self,
-        lm: np.ndarray,
-        finger_states: Dict[str, bool],
-        hand_scale: float
-    ) -> float:
+    def _calc_ok_score(self, feats: _HandFeatures) -> float:
         """计算OK手势的得分"""
-        # 拇指和食指形成圆圈，其他手指伸展
-        thumb_tip = lm[LandmarkIndex.THUMB_TIP][:2]
-        index_tip = lm[LandmarkIndex.INDEX_TIP][:2]
-        circle_dist = np.linalg.norm(thumb_tip - index_tip) / hand_scale
-
-        # 拇指食指要接触
-        circle_score = max(0, 1.0 - circle_dist / 0.2)
+        # 拇指和食指形成圆圈（要接触），其他手指伸展
+        circle_score = max(0, 1.0 - feats.thumb_index_dist / 0.2)
 
         # 其他手指要伸展
-        others_extended = sum(1 for f in ["middle", "ring", "pinky"] if finger_states[f])
+        finger_states = feats.finger_states
+        others_extended = sum(1 for f in _OTHER_FINGERS if finger_states[f])
         others_score = others_extended / 3.0
 
         return circle_score * 0.6 + others_score * 0.4
 
-    def _calc_thumbs_up_score(
-        self,
-        lm: np.ndarray,
-        finger_states: Dict[str, bool]
-    ) -> float:
+    def _calc_thumbs_up_score(self, feats: _HandFeatures) -> float:
         """计算竖大拇指的得分"""
         # 大拇指伸展
+        finger_states = feats.finger_states
         thumb_extended = finger_states["thumb"]
 
         if not thumb_extended:
             return 0.0
 
         # 其他四指弯曲
-        others_bent = sum(1 for f in ["index", "middle", "ring", "pinky"] if not finger_states[f])
+        others_bent = sum(1 for f in _NON_THUMB_FINGERS if not finger_states[f])
         others_score = others_bent / 4.0
 
         return others_score * 0.7 + 0.3
 
-    def _normalize_scores(self, scores: Dict[str, float]) -> Dict[str, float]:
-        """归一化分数"""
-        total = sum(scores.values())
-        if total < 0.001:
-            return {"idle": 1.0}
-
-        normalized = {k: v / total for k, v in scores.items()}
-
-        # 如果所有分数都很低，添加 idle
-        max_score = max(normalized.values())
-        if max_score < 0.3:
-            normalized["idle"] = 1.0 - max_score
-            # 重新归一化
-            total = sum(normalized.values())
-            normalized = {k: v / total for k, v in normalized.items()}
-
-        return normalized
-
     def detect_slide(
         self,
         hand: HandLandmarks,
@@ -351,45 +629,32 @@ class GestureClassifier:
         hand_id = hand.hand_id
         current_pos = hand.palm_center
 
-        # 初始化历史记录
-        if hand_id not in self._position_history:
-            self._position_history[hand_id] = []
-
-        history = self._position_history[hand_id]
-        history.append(current_pos.copy())
+        # 初始化环形缓冲
+        state = self._position_history.get(hand_id)
+        if state is None:
+            state = [np.zeros((10, 3), dtype=np.float32), 0, 0]
+            self._position_history[hand_id] = state
 
-        # 保持最近 10 帧
-        if len(history) > 10:
-            history.pop(0)
+        buf, idx, count = state
+        buf[idx] = current_pos
+        idx = (idx + 1) % 10
+        count = min(count + 1, 10)
+        state[1] = idx
+        state[2] = count
 
-        if len(history) < 5:
+        if count < 5:
             return None
 
-        # 计算位移
-        start_pos = history[0]
-        end_pos = history[-1]
-        delta = end_pos - start_pos
-
-        # 检查 Z 轴变化
-        if abs(delta[2]) > max_z_change:
+        # 位移与方向判定在标量核中完成（Numba 可整体编译）
+        dir_code, xy_distance = _slide_core(
+            buf, idx, count, min_distance, max_z_change)
+        if dir_code == 0:
             return None
 
-        # 计算 XY 平面位移
-        xy_distance = np.linalg.norm(delta[:2])
-
-        if xy_distance < min_distance:
-            return None
-
-        # 判断方向
-        if abs(delta[0]) > abs(delta[1]):
-            direction = "right" if delta[0] > 0 else "left"
-        else:
-            direction = "down" if delta[1] > 0 else "up"
-
-        # 清除历史（滑动完成）
-        self._position_history[hand_id] = []
+        # 清除历史（滑动完成，缓冲原地复用）
+        state[2] = 0
 
-        return (direction, xy_distance)
+        return (_SLIDE_DIRS[dir_code], float(xy_distance))
 
 
 # 测试代码
@@ -411,7 +676,7 @@ if __name__ == "__main__":
             )
 
             # 绘制关键点
-            output = detector.draw_landmarks(frame.image, result)
+            output = detector.draw_landmarks(frame.image, result, in_place=True)
 
             # 对每只手进行手势识别
             for hand in result.hands:
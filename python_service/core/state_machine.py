@@ -3,62 +3,181 @@
 负责手势的稳定化、去抖动和事件生成
 """
 
-import time
-from typing import Dict, Optional, List, Callable
+from time import monotonic_ns
+from typing import Dict, Optional, List, Callable, Tuple
 from dataclasses import dataclass, field
-from enum import Enum
-from collections import deque
+from enum import IntEnum
 import numpy as np
 
-from .gesture import GestureProba
+from .gesture import GestureProba, GestureType, GESTURE_SCORE_ORDER
 
+# Numba 可选（与 gesture 模块同一约定）：装了就把每帧的数值决策核
+# JIT 成 nopython 内核，没装走向量化/纯 Python 路径
+try:
+    from numba import njit as _njit
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
 
-class GestureState(Enum):
-    """手势状态枚举"""
-    IDLE = "idle"           # 空闲状态
-    ENTERING = "entering"   # 正在进入手势
-    HELD = "held"           # 手势保持中
-    EXITING = "exiting"     # 正在退出手势
 
+# 手势名 -> 固定向量下标，平滑滤波用定长 ndarray 而非字典
+GESTURE_NAMES = tuple(g.value for g in GestureType)
+GESTURE_INDEX = {name: i for i, name in enumerate(GESTURE_NAMES)}
+NUM_GESTURES = len(GESTURE_NAMES)
 
-@dataclass
+# 分类器得分向量顺序 -> 状态机向量下标的重排表
+_SCORE_PERM = np.array([GESTURE_INDEX[name] for name in GESTURE_SCORE_ORDER])
+
+
+def _select_candidate(proba: np.ndarray, priority_arr: np.ndarray, p_high: float):
+    """
+    候选手势选择核（update 每帧调用的数值核心）
+
+    超过 p_high 的候选取优先级最高者（同级取分高），
+    没有高分候选则取最高分。标量循环写法，Numba 可整体编译
+    """
+    best_i = 0
+    best_score = proba[0]
+    hi_i = -1
+    hi_pri = -1
+    hi_score = 0.0
+    for i in range(proba.shape[0]):
+        s = proba[i]
+        if s > best_score:
+            best_score = s
+            best_i = i
+        if s >= p_high:
+            pri = priority_arr[i]
+            if pri > hi_pri or (pri == hi_pri and s > hi_score):
+                hi_pri = pri
+                hi_score = s
+                hi_i = i
+    if hi_i >= 0:
+        return hi_i, hi_score
+    return best_i, best_score
+
+
+def _median5_cols(buf: np.ndarray, out: np.ndarray):
+    """
+    逐列中值核（窗口恰为 5 时的专用路径）
+
+    min/max 构成的中值网络，无分支无排序；np.median 每次调用都要
+    完整排序并分配临时数组，这里整列只做 10 次比较、零分配
+    """
+    for j in range(buf.shape[1]):
+        a = buf[0, j]
+        b = buf[1, j]
+        c = buf[2, j]
+        d = buf[3, j]
+        e = buf[4, j]
+        # median5(a..e) = median3(e, max(min(a,b),min(c,d)),
+        #                            min(max(a,b),max(c,d)))
+        f = max(min(a, b), min(c, d))
+        g = min(max(a, b), max(c, d))
+        out[j] = max(min(e, f), min(max(e, f), g))
+
+
+if _HAS_NUMBA:
+    _select_candidate = _njit(cache=True)(_select_candidate)
+    _median5_cols = _njit(cache=True)(_median5_cols)
+
+
+class GestureState(IntEnum):
+    """手势状态枚举（IntEnum：值即派发表下标，见 _handlers）"""
+    IDLE = 0        # 空闲状态
+    ENTERING = 1    # 正在进入手势
+    HELD = 2        # 手势保持中
+    EXITING = 3     # 正在退出手势
+
+    @property
+    def label(self) -> str:
+        """小写状态名（序列化/显示用，替代原字符串枚举值）"""
+        return self.name.lower()
+
+
+@dataclass(slots=True)
 class GestureEvent:
-    """手势事件"""
+    """手势事件（slots 降低高频构造开销；meta 按需创建）"""
     event_type: str          # "enter" | "hold" | "exit"
     gesture: str             # 手势类型
     hand_id: str             # 手部 ID
     timestamp: float         # 时间戳
     hold_duration: float     # 保持时长（毫秒）
     confidence: float        # 置信度
-    meta: Dict = field(default_factory=dict)  # 附加信息（如滑动方向）
+    meta: Optional[Dict] = None  # 附加信息（如滑动方向）
 
-    def to_dict(self) -> Dict:
-        return {
-            "event_type": self.event_type,
-            "gesture": self.gesture,
-            "hand_id": self.hand_id,
-            "timestamp": self.timestamp,
-            "hold_duration": self.hold_duration,
-            "confidence": self.confidence,
-            "meta": self.meta
-        }
+    # to_dict 复用的序列化字典（非构造参数，仅内部缓存；
+    # init=False 保证 replace/拷贝出的实例各有独立缓存）
+    _dict: Optional[Dict] = field(
+        init=False, default=None, repr=False, compare=False)
 
+    def to_dict(self) -> Dict:
+        """
+        序列化为字典
 
-@dataclass
+        返回内部复用的字典（只读快照）：对复用的 hold 事件对象而言
+        每帧只改值不再新建哈希表。需要跨帧保留时自行 dict(...) 拷贝
+        """
+        d = self._dict
+        if d is None:
+            d = self._dict = {}
+        d["event_type"] = self.event_type
+        d["gesture"] = self.gesture
+        d["hand_id"] = self.hand_id
+        d["timestamp"] = self.timestamp
+        d["hold_duration"] = self.hold_duration
+        d["confidence"] = self.confidence
+        d["meta"] = self.meta or {}
+        return d
+
+
+# HandGestureState.scalars 的槽位下标（热路径标量打包进连续数组）
+_ENTER_TIME = 0   # 进入手势的时间（毫秒）
+_LAST_UPD = 1     # 最近一次更新时间（毫秒）
+_HOLD_DUR = 2     # 保持时长（毫秒）
+_CONF = 3         # 置信度
+
+
+@dataclass(slots=True)
 class HandGestureState:
     """单手的手势状态"""
     state: GestureState = GestureState.IDLE
     gesture: str = "idle"
-    enter_time: float = 0.0
-    last_update_time: float = 0.0
-    hold_duration: float = 0.0
-    confidence: float = 0.0
+    gesture_idx: int = 0     # gesture 在 GESTURE_NAMES 中的下标（idle=0）
+
+    # 时间/置信度标量打包进一个连续 float64 数组（下标见 _ENTER_TIME
+    # 等），热路径按下标读写，免去逐字段装箱的 Python float；
+    # 外部只读访问走下方 property
+    scalars: np.ndarray = field(
+        default_factory=lambda: np.zeros(4, dtype=np.float64))
+
+    # hold 事件对象复用槽（HELD 状态每帧一个事件，就地改字段而非新建；
+    # 回调方不得长期持有该对象，需保留时自行拷贝）
+    hold_event: Optional["GestureEvent"] = None
 
-    # 用于平滑的历史概率
-    proba_history: deque = field(default_factory=lambda: deque(maxlen=10))
+    # 中值滤波环形缓冲 (median_window x NUM_GESTURES)，就地更新零分配
+    probs_ring: Optional[np.ndarray] = None
+    ring_idx: int = 0
+    ring_count: int = 0
 
-    # EMA 平滑值
-    smoothed_proba: Dict[str, float] = field(default_factory=dict)
+    # EMA 平滑向量 (NUM_GESTURES,)
+    ema: Optional[np.ndarray] = None
+
+    @property
+    def enter_time(self) -> float:
+        return self.scalars[_ENTER_TIME]
+
+    @property
+    def last_update_time(self) -> float:
+        return self.scalars[_LAST_UPD]
+
+    @property
+    def hold_duration(self) -> float:
+        return self.scalars[_HOLD_DUR]
+
+    @property
+    def confidence(self) -> float:
+        return self.scalars[_CONF]
 
 
 class GestureStateMachine:
@@ -104,27 +223,90 @@ class GestureStateMachine:
             "idle": 0
         }
 
-        # 各手的状态
-        self._hand_states: Dict[str, HandGestureState] = {}
+        # 优先级按 GESTURE_NAMES 下标展开成定长数组，供数值核使用
+        self._priority_arr = np.array(
+            [self.gesture_priority.get(g, 0) for g in GESTURE_NAMES],
+            dtype=np.int32
+        )
+
+        # 各手的状态：hand_id 首次出现时分配小整数下标，
+        # 状态存 list、冷却截止时间存定长 float 数组（哨兵 -inf），
+        # 每帧只剩一次 id->下标查找，冷却判断是一次浮点比较
+        self._hand_id_to_idx: Dict[str, int] = {}
+        self._states_list: List[HandGestureState] = []
+        self._cooldown_until_arr = np.full(8, -np.inf, dtype=np.float64)
+
+        # 概率向量临时缓冲（update 按手顺序串行调用，可安全复用）
+        self._proba_vec = np.zeros(NUM_GESTURES, dtype=np.float32)
+
+        # 中值滤波：窗口为 5 且装有 Numba 时走中值网络核（写入复用
+        # 缓冲），否则用 np.partition 取第 k 小（O(W)，免完整排序）
+        self._median_k = self.median_window // 2
+        self._median_buf = np.empty(NUM_GESTURES, dtype=np.float32)
+
+        # 事件回调（元组存储，分发时迭代更快且不可变）
+        self._callbacks: Tuple[Callable[[GestureEvent], None], ...] = ()
+
+        # 状态转换派发表：按 GestureState 整数值索引，update 里
+        # 一次取下标一次调用替代逐个 if/elif 比较
+        self._handlers = (
+            self._handle_idle,
+            self._handle_entering,
+            self._handle_held,
+            self._handle_exiting,
+        )
+
+        # 调试输出（默认关闭；开启后每秒最多打印一次候选手势）
+        self._debug = False
+        self._last_debug_ms = 0.0
+
+    def warmup(self):
+        """
+        预热 Numba 内核：用哑输入触发 JIT 编译（cache=True 时后续
+        启动直接加载磁盘缓存），避免首帧几百毫秒的编译停顿。
+        未装 Numba 时为空操作
+        """
+        if not _HAS_NUMBA:
+            return
+        dummy = np.zeros(NUM_GESTURES, dtype=np.float32)
+        _select_candidate(dummy, self._priority_arr, self.p_high)
+        if self.median_window == 5:
+            _median5_cols(
+                np.zeros((5, NUM_GESTURES), dtype=np.float32), dummy)
 
-        # 冷却时间记录
-        self._cooldown_until: Dict[str, float] = {}
+    def register_callback(self, callback: Callable[[GestureEvent], None]):
+        """
+        注册事件回调（事件在 update 内就地分发）
 
-        # 事件回调
-        self._callbacks: List[Callable[[GestureEvent], None]] = []
+        可调用性在注册时校验，分发时直接调用、不再逐个包
+        try/except（异常设置本身在热路径上有开销）；回调抛出的
+        异常会向上传播，需要异常隔离用 register_safe_callback
+        """
+        if not callable(callback):
+            raise TypeError(f"事件回调不可调用: {callback!r}")
+        self._callbacks = self._callbacks + (callback,)
 
-    def register_callback(self, callback: Callable[[GestureEvent], None]):
-        """注册事件回调"""
-        self._callbacks.append(callback)
+    def register_safe_callback(self, callback: Callable[[GestureEvent], None]):
+        """注册带异常隔离的回调：异常只打印告警，不中断事件分发"""
+        if not callable(callback):
+            raise TypeError(f"事件回调不可调用: {callback!r}")
 
-    def _emit_event(self, event: GestureEvent):
-        """发送事件"""
-        for callback in self._callbacks:
+        def _safe(event, _cb=callback):
             try:
-                callback(event)
+                _cb(event)
             except Exception as e:
                 print(f"[WARN] 事件回调异常: {e}")
 
+        self._callbacks = self._callbacks + (_safe,)
+
+    def _emit_event(self, event: GestureEvent):
+        """发送事件"""
+        cbs = self._callbacks
+        if not cbs:
+            return
+        for cb in cbs:
+            cb(event)
+
     def update(
         self,
         hand_id: str,
@@ -137,212 +319,334 @@ class GestureStateMachine:
         Args:
             hand_id: 手部标识符
             proba: 手势概率分布
-            timestamp: 时间戳（毫秒），默认使用当前时间
+            timestamp: 时间戳（毫秒，单调时钟），默认取 monotonic_ns
 
         Returns:
             如果产生了事件则返回 GestureEvent，否则返回 None
         """
         if timestamp is None:
-            timestamp = time.time() * 1000
+            # 单调时钟整数毫秒：不受 NTP 回拨影响，取数比 time.time()
+            # 便宜，状态机只关心时间差
+            timestamp = monotonic_ns() // 1_000_000
 
         # 获取或创建手部状态
-        if hand_id not in self._hand_states:
-            self._hand_states[hand_id] = HandGestureState()
+        idx = self._hand_id_to_idx.get(hand_id)
+        if idx is None:
+            idx = len(self._states_list)
+            self._hand_id_to_idx[hand_id] = idx
+            self._states_list.append(self._new_hand_state())
+            if idx >= self._cooldown_until_arr.shape[0]:
+                self._cooldown_until_arr = np.concatenate([
+                    self._cooldown_until_arr,
+                    np.full(self._cooldown_until_arr.shape[0],
+                            -np.inf, dtype=np.float64)
+                ])
+
+        hs = self._states_list[idx]
+
+        # 检查冷却（-inf 哨兵表示无冷却，无需字典增删）
+        if timestamp < self._cooldown_until_arr[idx]:
+            return None
+
+        # 平滑概率（定长向量，全程无字典）
+        smoothed = self._smooth_proba(hs, proba)
+
+        # 找到最高优先级的候选手势（下标制，热路径不做手势名哈希）
+        candidate_idx, candidate_score = self._get_best_gesture(smoothed)
+
+        # 调试：每秒打印一次候选手势（复用传入的时间戳，热路径无系统调用）
+        if self._debug and timestamp - self._last_debug_ms > 1000.0:
+            self._last_debug_ms = timestamp
+            print(f"[DEBUG] 候选手势={GESTURE_NAMES[candidate_idx]}, 分数={candidate_score:.2f}, 阈值={self.p_high}")
+
+        # 状态机转换（按状态值直接派发到对应处理函数）
+        event = self._handlers[hs.state](
+            hs, idx, hand_id, candidate_idx, candidate_score,
+            smoothed, timestamp
+        )
+
+        hs.scalars[_LAST_UPD] = timestamp
 
-        hs = self._hand_states[hand_id]
-
-        # 检查冷却
-        if hand_id in self._cooldown_until:
-            if timestamp < self._cooldown_until[hand_id]:
-                return None
-            else:
-                del self._cooldown_until[hand_id]
-
-        # 平滑概率
-        smoothed = self._smooth_proba(hs, proba.probabilities)
-
-        # 找到最高优先级的候选手势
-        candidate_gesture, candidate_score = self._get_best_gesture(smoothed)
-
-        # 调试：每秒打印一次候选手势（避免刷屏）
-        import time
-        current_sec = int(time.time())
-        if not hasattr(self, '_last_debug_sec') or self._last_debug_sec != current_sec:
-            self._last_debug_sec = current_sec
-            print(f"[DEBUG] 候选手势={candidate_gesture}, 分数={candidate_score:.2f}, 阈值={self.p_high}", flush=True)
-
-        # 状态机转换
-        event = None
-
-        if hs.state == GestureState.IDLE:
-            # 空闲状态：检测手势进入
-            if candidate_score > self.p_high:
-                hs.state = GestureState.ENTERING
-                hs.gesture = candidate_gesture
-                hs.enter_time = timestamp
-                hs.confidence = candidate_score
-                print(f"[STATE] {candidate_gesture} 进入 ENTERING 状态", flush=True)
-
-        elif hs.state == GestureState.ENTERING:
-            # 进入中：检查是否稳定进入
-            if candidate_gesture == hs.gesture and candidate_score > self.p_high:
-                # 持续保持
-                if timestamp - hs.enter_time >= self.t_enter:
-                    # 正式进入
-                    hs.state = GestureState.HELD
-                    hs.hold_duration = 0
-
-                    event = GestureEvent(
-                        event_type="enter",
-                        gesture=hs.gesture,
-                        hand_id=hand_id,
-                        timestamp=timestamp,
-                        hold_duration=0,
-                        confidence=candidate_score
-                    )
-                    print(f"[STATE] 触发 enter 事件: {hs.gesture}", flush=True)
-                    self._emit_event(event)
-            else:
-                # 切换或退出
-                hs.state = GestureState.IDLE
-                hs.gesture = "idle"
-
-        elif hs.state == GestureState.HELD:
-            # 保持中：检查是否退出或切换
-            current_score = smoothed.get(hs.gesture, 0)
-            current_priority = self.gesture_priority.get(hs.gesture, 0)
-            candidate_priority = self.gesture_priority.get(candidate_gesture, 0)
-
-            # 检查是否应该切换到更高优先级的手势
-            should_switch = (
-                candidate_gesture != hs.gesture and
-                candidate_score > self.p_high and
-                candidate_priority > current_priority  # 新手势优先级更高
-            )
-
-            if should_switch:
-                # 切换到更高优先级的手势
-                print(f"[STATE] 切换手势: {hs.gesture} -> {candidate_gesture}", flush=True)
-                exit_event = GestureEvent(
-                    event_type="exit",
-                    gesture=hs.gesture,
-                    hand_id=hand_id,
-                    timestamp=timestamp,
-                    hold_duration=hs.hold_duration,
-                    confidence=current_score
-                )
-                self._emit_event(exit_event)
+        return event
 
-                # 进入新手势
-                hs.state = GestureState.ENTERING
-                hs.gesture = candidate_gesture
-                hs.enter_time = timestamp
-                hs.confidence = candidate_score
 
-            elif current_score >= self.p_hold:
-                # 继续保持
-                hs.hold_duration = timestamp - hs.enter_time
-                hs.confidence = current_score
+    def _handle_idle(self, hs, idx, hand_id, candidate_idx,
+                     candidate_score, smoothed, timestamp):
+        """IDLE：检测手势进入"""
+        if candidate_score > self.p_high:
+            hs.state = GestureState.ENTERING
+            hs.gesture = GESTURE_NAMES[candidate_idx]
+            hs.gesture_idx = candidate_idx
+            sc = hs.scalars
+            sc[_ENTER_TIME] = timestamp
+            sc[_CONF] = candidate_score
+            if self._debug:
+                print(f"[STATE] {hs.gesture} 进入 ENTERING 状态")
+        return None
+
+    def _handle_entering(self, hs, idx, hand_id, candidate_idx,
+                         candidate_score, smoothed, timestamp):
+        """ENTERING：检查是否稳定进入"""
+        if candidate_idx == hs.gesture_idx and candidate_score > self.p_high:
+            # 持续保持
+            if timestamp - hs.scalars[_ENTER_TIME] >= self.t_enter:
+                # 正式进入
+                hs.state = GestureState.HELD
+                hs.scalars[_HOLD_DUR] = 0
 
-                # 发送 hold 事件（通过回调触发，用于鼠标移动等持续动作）
                 event = GestureEvent(
-                    event_type="hold",
+                    event_type="enter",
                     gesture=hs.gesture,
                     hand_id=hand_id,
                     timestamp=timestamp,
-                    hold_duration=hs.hold_duration,
-                    confidence=current_score
+                    hold_duration=0,
+                    confidence=candidate_score
                 )
+                if self._debug:
+                    print(f"[STATE] 触发 enter 事件: {hs.gesture}")
                 self._emit_event(event)
-
-            elif current_score < self.p_low:
-                # 开始退出
-                hs.state = GestureState.EXITING
-                hs.last_update_time = timestamp
-
-            elif candidate_gesture != hs.gesture and candidate_score > self.p_high:
-                # 手势切换（优先级相同或更低的情况）
-                exit_event = GestureEvent(
-                    event_type="exit",
+                return event
+        else:
+            # 切换或退出
+            hs.state = GestureState.IDLE
+            hs.gesture = "idle"
+            hs.gesture_idx = 0
+        return None
+
+    def _handle_held(self, hs, idx, hand_id, candidate_idx,
+                     candidate_score, smoothed, timestamp):
+        """HELD：检查是否退出或切换（全部下标访问，无字符串哈希）"""
+        sc = hs.scalars
+        current_score = float(smoothed[hs.gesture_idx])
+        current_priority = self._priority_arr[hs.gesture_idx]
+        candidate_priority = self._priority_arr[candidate_idx]
+
+        # 检查是否应该切换到更高优先级的手势
+        should_switch = (
+            candidate_idx != hs.gesture_idx and
+            candidate_score > self.p_high and
+            candidate_priority > current_priority  # 新手势优先级更高
+        )
+
+        if should_switch:
+            # 切换到更高优先级的手势
+            if self._debug:
+                print(f"[STATE] 切换手势: {hs.gesture} -> "
+                      f"{GESTURE_NAMES[candidate_idx]}")
+            exit_event = GestureEvent(
+                event_type="exit",
+                gesture=hs.gesture,
+                hand_id=hand_id,
+                timestamp=timestamp,
+                hold_duration=sc[_HOLD_DUR],
+                confidence=current_score
+            )
+            self._emit_event(exit_event)
+
+            # 进入新手势
+            hs.state = GestureState.ENTERING
+            hs.gesture = GESTURE_NAMES[candidate_idx]
+            hs.gesture_idx = candidate_idx
+            sc[_ENTER_TIME] = timestamp
+            sc[_CONF] = candidate_score
+
+        elif current_score >= self.p_hold:
+            # 继续保持
+            sc[_HOLD_DUR] = timestamp - sc[_ENTER_TIME]
+            sc[_CONF] = current_score
+
+            # 发送 hold 事件（通过回调触发，用于鼠标移动等持续动作）
+            # 复用缓存对象：hold 是占绝对多数的事件类型，逐帧新建
+            # 会制造大量短命对象喂给 GC
+            event = hs.hold_event
+            if event is None:
+                event = hs.hold_event = GestureEvent(
+                    event_type="hold",
                     gesture=hs.gesture,
                     hand_id=hand_id,
                     timestamp=timestamp,
-                    hold_duration=hs.hold_duration,
+                    hold_duration=sc[_HOLD_DUR],
                     confidence=current_score
                 )
-                self._emit_event(exit_event)
+            else:
+                event.gesture = hs.gesture
+                event.timestamp = timestamp
+                event.hold_duration = sc[_HOLD_DUR]
+                event.confidence = current_score
+            self._emit_event(event)
+            return event
+
+        elif current_score < self.p_low:
+            # 开始退出
+            hs.state = GestureState.EXITING
+            sc[_LAST_UPD] = timestamp
+
+        elif candidate_idx != hs.gesture_idx and candidate_score > self.p_high:
+            # 手势切换（优先级相同或更低的情况）
+            exit_event = GestureEvent(
+                event_type="exit",
+                gesture=hs.gesture,
+                hand_id=hand_id,
+                timestamp=timestamp,
+                hold_duration=sc[_HOLD_DUR],
+                confidence=current_score
+            )
+            self._emit_event(exit_event)
+
+            # 进入新手势
+            hs.state = GestureState.ENTERING
+            hs.gesture = GESTURE_NAMES[candidate_idx]
+            hs.gesture_idx = candidate_idx
+            sc[_ENTER_TIME] = timestamp
+            sc[_CONF] = candidate_score
+        return None
+
+    def _handle_exiting(self, hs, idx, hand_id, candidate_idx,
+                        candidate_score, smoothed, timestamp):
+        """EXITING：检查是否恢复或确认退出"""
+        sc = hs.scalars
+        current_score = float(smoothed[hs.gesture_idx])
+
+        if current_score >= self.p_hold:
+            # 恢复保持
+            hs.state = GestureState.HELD
+        elif timestamp - sc[_LAST_UPD] >= self.t_exit:
+            # 确认退出
+            event = GestureEvent(
+                event_type="exit",
+                gesture=hs.gesture,
+                hand_id=hand_id,
+                timestamp=timestamp,
+                hold_duration=sc[_HOLD_DUR],
+                confidence=current_score
+            )
+            self._emit_event(event)
 
-                # 进入新手势
-                hs.state = GestureState.ENTERING
-                hs.gesture = candidate_gesture
-                hs.enter_time = timestamp
-                hs.confidence = candidate_score
+            # 进入冷却
+            self._cooldown_until_arr[idx] = timestamp + self.t_cooldown
 
-        elif hs.state == GestureState.EXITING:
-            # 退出中：检查是否恢复或确认退出
-            current_score = smoothed.get(hs.gesture, 0)
+            # 重置状态
+            hs.state = GestureState.IDLE
+            hs.gesture = "idle"
+            hs.gesture_idx = 0
+            sc[_HOLD_DUR] = 0
+            return event
+        return None
 
-            if current_score >= self.p_hold:
-                # 恢复保持
-                hs.state = GestureState.HELD
-            elif timestamp - hs.last_update_time >= self.t_exit:
-                # 确认退出
-                event = GestureEvent(
-                    event_type="exit",
-                    gesture=hs.gesture,
-                    hand_id=hand_id,
-                    timestamp=timestamp,
-                    hold_duration=hs.hold_duration,
-                    confidence=current_score
-                )
-                self._emit_event(event)
+    def update_batch(
+        self,
+        hands,
+        proba_matrix: np.ndarray,
+        timestamp: Optional[float] = None
+    ) -> List[GestureEvent]:
+        """
+        批量更新一帧内所有手的状态
 
-                # 进入冷却
-                self._cooldown_until[hand_id] = timestamp + self.t_cooldown
+        Args:
+            hands: HandLandmarks 序列（行序与 proba_matrix 对应）
+            proba_matrix: (H, N) 得分矩阵，列序为 GESTURE_SCORE_ORDER
+            timestamp: 帧时间戳（毫秒），所有手共用一次取数
 
-                # 重置状态
-                hs.state = GestureState.IDLE
-                hs.gesture = "idle"
-                hs.hold_duration = 0
+        Returns:
+            本帧产生的事件列表（可能为空）
+        """
+        if timestamp is None:
+            timestamp = monotonic_ns() // 1_000_000
+
+        events = []
+        for i, hand in enumerate(hands):
+            event = self.update(
+                hand.hand_id,
+                GestureProba.from_scores(proba_matrix[i]),
+                timestamp
+            )
+            if event is not None:
+                events.append(event)
+        return events
 
-        hs.last_update_time = timestamp
+    def _new_hand_state(self) -> HandGestureState:
+        """创建单手状态，预分配平滑滤波用的 NumPy 缓冲
 
-        return event
+        概率在 [0,1] 且只参与中值比较，环形缓冲存 float16 即可
+        （行写入时自动降精度，读中值时升回 float32）；Numba 中值
+        网络核走 float32——CPU 端 nopython 对 float16 支持不完整
+        """
+        hs = HandGestureState()
+        ring_dtype = (
+            np.float32 if (_HAS_NUMBA and self.median_window == 5)
+            else np.float16
+        )
+        hs.probs_ring = np.zeros(
+            (self.median_window, NUM_GESTURES), dtype=ring_dtype
+        )
+        hs.ema = np.zeros(NUM_GESTURES, dtype=np.float32)
+        return hs
 
     def _smooth_proba(
         self,
         hs: HandGestureState,
-        proba: Dict[str, float]
-    ) -> Dict[str, float]:
+        proba: GestureProba
+    ) -> np.ndarray:
         """
         平滑概率值
 
-        使用 EMA（指数移动平均）+ 中值滤波
+        使用 EMA（指数移动平均）+ 中值滤波，全部在预分配的
+        定长 ndarray 上就地完成，每帧摊销 O(手势数) 且无堆分配。
+        返回平滑后的定长向量（下标见 GESTURE_INDEX）
+
+        历史所有权在状态机侧：得分向量按值写入环形缓冲
+        （probs_ring 行赋值即拷贝），调用方无需也不应传入副本
         """
-        # 更新历史
-        hs.proba_history.append(proba.copy())
-
-        # EMA 平滑
-        for gesture, p in proba.items():
-            if gesture in hs.smoothed_proba:
-                hs.smoothed_proba[gesture] = (
-                    self.ema_alpha * p +
-                    (1 - self.ema_alpha) * hs.smoothed_proba[gesture]
-                )
+        # 得分向量按重排表直接写入，分类器给的是字典时再逐项转换
+        vec = self._proba_vec
+        scores = proba.scores
+        if scores is not None:
+            # 仅调试构建（-O 下剥除）：重排表写入默认形状/类型正确
+            assert scores.shape == (NUM_GESTURES,) \
+                and scores.dtype == np.float32, \
+                f"得分向量形状/类型不符: {scores.shape} {scores.dtype}"
+            vec[_SCORE_PERM] = scores
+        else:
+            vec.fill(0.0)
+            for gesture, p in proba.probabilities.items():
+                idx = GESTURE_INDEX.get(gesture)
+                if idx is not None:
+                    vec[idx] = p
+
+        # 写入环形缓冲（整行连续写入，一次 memcpy）
+        hs.probs_ring[hs.ring_idx] = vec
+        hs.ring_idx = (hs.ring_idx + 1) % self.median_window
+
+        if hs.ring_count == 0:
+            # 首帧直接作为 EMA 初值
+            hs.ema[:] = vec
+        else:
+            # EMA 平滑（向量化）：ema += alpha * (vec - ema)
+            hs.ema += self.ema_alpha * (vec - hs.ema)
+
+        if hs.ring_count < self.median_window:
+            hs.ring_count += 1
+
+        # 中值滤波（窗口填满后）：np.median 每列完整排序且分配临时，
+        # 改为中值网络核 / partition 选择第 k 小。偶数窗口取下中位
+        # （np.median 会取均值，默认窗口为奇数，不受影响）
+        if hs.ring_count >= self.median_window:
+            if _HAS_NUMBA and self.median_window == 5:
+                smoothed = self._median_buf
+                _median5_cols(hs.probs_ring, smoothed)
             else:
-                hs.smoothed_proba[gesture] = p
-
-        # 中值滤波（对历史数据）
-        if len(hs.proba_history) >= self.median_window:
-            result = {}
-            for gesture in proba.keys():
-                values = [h.get(gesture, 0) for h in list(hs.proba_history)[-self.median_window:]]
-                result[gesture] = float(np.median(values))
-            return result
+                # float16 环形缓冲：partition 选第 k 小后升回 float32
+                # （写入复用缓冲，下游数值核拿到的仍是 float32）
+                smoothed = self._median_buf
+                np.copyto(smoothed, np.partition(
+                    hs.probs_ring, self._median_k, axis=0
+                )[self._median_k])
+        else:
+            smoothed = hs.ema
 
-        return hs.smoothed_proba.copy()
+        return smoothed
 
-    def _get_best_gesture(self, proba: Dict[str, float]) -> tuple:
+    def _get_best_gesture(self, proba: np.ndarray) -> tuple:
         """
         根据概率和优先级选择最佳手势
 
@@ -352,35 +656,37 @@ class GestureStateMachine:
         3. 如果没有超过阈值的，选择分数最高的
 
         Returns:
-            (手势名, 概率)
+            (手势下标, 概率)，手势名见 GESTURE_NAMES
         """
-        candidates = []
-        for gesture, score in proba.items():
-            priority = self.gesture_priority.get(gesture, 0)
-            candidates.append((gesture, score, priority))
-
-        if not candidates:
-            return "idle", 0.0
-
-        # 筛选出分数超过阈值的候选
-        high_score_candidates = [c for c in candidates if c[1] >= self.p_high]
-
-        if high_score_candidates:
-            # 在高分候选中，优先级优先，其次是分数
-            high_score_candidates.sort(key=lambda x: (x[2], x[1]), reverse=True)
-            return high_score_candidates[0][0], high_score_candidates[0][1]
+        if _HAS_NUMBA:
+            idx, score = _select_candidate(proba, self._priority_arr, self.p_high)
+            return int(idx), float(score)
+
+        # 向量化选择：优先级放大后叠加分数做 argmax，
+        # 等价于 (优先级, 分数) 降序排序取首位，但无候选列表和排序
+        mask = proba >= self.p_high
+        if mask.any():
+            idx = int(np.argmax(
+                np.where(mask, self._priority_arr * 1e6 + proba, -1.0)
+            ))
         else:
-            # 没有高分候选，按分数选择
-            candidates.sort(key=lambda x: x[1], reverse=True)
-            return candidates[0][0], candidates[0][1]
+            idx = int(np.argmax(proba))
+
+        return idx, float(proba[idx])
 
     def get_state(self, hand_id: str) -> Optional[HandGestureState]:
         """获取指定手的状态"""
-        return self._hand_states.get(hand_id)
+        idx = self._hand_id_to_idx.get(hand_id)
+        if idx is None:
+            return None
+        return self._states_list[idx]
 
     def get_all_states(self) -> Dict[str, HandGestureState]:
         """获取所有手的状态"""
-        return self._hand_states.copy()
+        return {
+            hand_id: self._states_list[idx]
+            for hand_id, idx in self._hand_id_to_idx.items()
+        }
 
     def reset(self, hand_id: Optional[str] = None):
         """
@@ -390,11 +696,14 @@ class GestureStateMachine:
             hand_id: 指定手部 ID，为 None 时重置所有
         """
         if hand_id:
-            if hand_id in self._hand_states:
-                self._hand_states[hand_id] = HandGestureState()
+            idx = self._hand_id_to_idx.get(hand_id)
+            if idx is not None:
+                self._states_list[idx] = self._new_hand_state()
+                self._cooldown_until_arr[idx] = -np.inf
         else:
-            self._hand_states.clear()
-            self._cooldown_until.clear()
+            self._hand_id_to_idx.clear()
+            self._states_list.clear()
+            self._cooldown_until_arr.fill(-np.inf)
 
 
 # 测试代码
@@ -424,7 +733,7 @@ if __name__ == "__main__":
                 timestamp=frame.timestamp
             )
 
-            output = detector.draw_landmarks(frame.image, result)
+            output = detector.draw_landmarks(frame.image, result, in_place=True)
 
             # 处理每只手
             for hand in result.hands:
@@ -444,7 +753,7 @@ if __name__ == "__main__":
                 # 显示
                 wrist_pos = hand.landmarks_pixel[0]
                 if state:
-                    text = f"{state.gesture} [{state.state.value}]"
+                    text = f"{state.gesture} [{state.state.label}]"
                     color = (0, 255, 0) if state.state == GestureState.HELD else (0, 255, 255)
                     cv2.putText(output, text, (wrist_pos[0], wrist_pos[1] + 30),
                                cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
@@ -24,7 +24,7 @@ def run_debug_mode(config: Config):
     """
     from core.capture import CameraCapture
     from core.detector import HandDetector
-    from core.gesture import GestureClassifier
+    from core.gesture import GestureClassifier, GESTURE_SCORE_ORDER
     from core.state_machine import GestureStateMachine, GestureEvent, GestureState
     from core.action import ActionExecutor
 
@@ -49,18 +49,19 @@ def run_debug_mode(config: Config):
     state_machine = GestureStateMachine()
     action_executor = ActionExecutor()
 
+    # 进入主循环前预热 JIT 内核，首帧不再付编译成本
+    classifier.warmup()
+    state_machine.warmup()
+
     # 事件回调
     def on_gesture_event(event: GestureEvent):
         print(f"[EVENT] {event.event_type}: {event.gesture} "
               f"(hand={event.hand_id}, duration={event.hold_duration:.0f}ms)")
 
-        # 获取手部位置
-        hand_pos = None
-        if hasattr(on_gesture_event, 'last_detection'):
-            for hand in on_gesture_event.last_detection.hands:
-                if hand.hand_id == event.hand_id:
-                    hand_pos = (hand.landmarks[8][0], hand.landmarks[8][1])
-                    break
+        # 获取手部位置（hand_id 索引字典，免去逐手线性扫描——
+        # hold 事件逐帧触发，扫描成本会按帧累积）
+        hand = on_gesture_event.hand_index.get(event.hand_id)
+        hand_pos = (hand.landmarks[8][0], hand.landmarks[8][1]) if hand else None
 
         # 执行动作
         action_executor.execute_gesture(
@@ -70,6 +71,7 @@ def run_debug_mode(config: Config):
             meta=event.meta
         )
 
+    on_gesture_event.hand_index = {}
     state_machine.register_callback(on_gesture_event)
 
     # 启动摄像头
@@ -78,29 +80,37 @@ def run_debug_mode(config: Config):
         return
 
     try:
+        # 采集线程（CameraCapture 内部的单槽缓冲）做生产者，
+        # 这里把推理也放进流水线：提交当前帧、处理上一帧的结果，
+        # 推理与绘制/GUI 重叠执行
+        prev_frame = None
         for frame in camera.read_generator():
-            # 检测
-            result = detector.detect(
+            result = detector.detect_pipelined(
                 frame.image,
                 frame_id=frame.frame_id,
                 timestamp=frame.timestamp
             )
-            on_gesture_event.last_detection = result
+            if result is None or prev_frame is None:
+                # 首帧：流水线尚无结果
+                prev_frame = frame
+                continue
+
+            # result 对应 prev_frame（当前帧还在推理线程里，
+            # 在上一帧图像上绘制，避免与推理线程并发读写）
+            frame, prev_frame = prev_frame, frame
+            on_gesture_event.hand_index = {h.hand_id: h for h in result.hands}
 
             # 绘制骨骼
-            output = detector.draw_landmarks(frame.image, result)
+            output = detector.draw_landmarks(frame.image, result, in_place=True)
 
-            # 处理每只手
-            for hand in result.hands:
-                # 分类
-                gesture_proba = classifier.classify(hand)
+            # 批量分类 + 批量状态机更新（每帧两次调用，
+            # 省掉每只手的 Python 方法分发开销），绘制仍逐手进行
+            hands = result.hands
+            proba_matrix = classifier.classify_batch(hands)
+            state_machine.update_batch(hands, proba_matrix, frame.timestamp)
 
-                # 状态机更新
-                state_machine.update(
-                    hand.hand_id,
-                    gesture_proba,
-                    frame.timestamp
-                )
+            for i, hand in enumerate(hands):
+                scores = proba_matrix[i]
 
                 # 检测滑动
                 slide = classifier.detect_slide(hand)
@@ -131,8 +141,9 @@ def run_debug_mode(config: Config):
                     cv2.putText(output, gesture_text, (wrist_pos[0], wrist_pos[1] + 30),
                                cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
 
-                    # 显示概率
-                    proba_text = f"{gesture_proba.dominant_gesture}: {gesture_proba.dominant_score:.2f}"
+                    # 显示概率（直接从得分矩阵行取主导手势）
+                    dom = int(scores.argmax())
+                    proba_text = f"{GESTURE_SCORE_ORDER[dom]}: {scores[dom]:.2f}"
                     cv2.putText(output, proba_text, (wrist_pos[0], wrist_pos[1] + 60),
                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
 
@@ -9,8 +9,9 @@ import time
 import threading
 import socketserver
 from typing import Set, Optional, Dict, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from http.server import HTTPServer, BaseHTTPRequestHandler
+import os
 import websockets
 from websockets.server import WebSocketServerProtocol
 import cv2
@@ -24,23 +25,140 @@ from core.action import ActionExecutor
 from config.settings import Config, default_config
 
 
-# Global reference for MJPEG stream
-_current_frame: Optional[np.ndarray] = None
-_frame_lock = threading.Lock()
+# JPEG 编码可选加速：装有 PyTurboJPEG（libjpeg-turbo 绑定，SIMD
+# Huffman）时用之，比 OpenCV 的编码路径快 2-4 倍；未装回退 cv2。
+# 构造失败（如系统缺 libturbojpeg）同样回退
+try:
+    from turbojpeg import TurboJPEG
+    _turbo_jpeg = TurboJPEG()
+    _HAS_TURBOJPEG = True
+except Exception:
+    _turbo_jpeg = None
+    _HAS_TURBOJPEG = False
+
+# JSON 序列化可选加速：orjson 原生处理 numpy 数组（免 .tolist()
+# 往返），小字典编码比标准库快数倍；未装回退 json
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    orjson = None
+    _HAS_ORJSON = False
+
+_JPEG_QUALITY = 70
+_CV2_JPEG_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, _JPEG_QUALITY]
+
+
+def encode_jpeg(frame: np.ndarray) -> Optional[bytes]:
+    """把一帧 BGR 图像编码为 JPEG 字节串，失败返回 None
+
+    刻意不走 cv2.cuda/nvJPEG：pip 的 opencv-python 轮子不带 CUDA，
+    cv2.cuda 模块也没有绘制原语，骨骼叠加仍得回 CPU 做，上传/下载
+    一来一回抵消编码收益；640x480 下 CPU（SIMD）编码只有几毫秒
+    """
+    if _HAS_TURBOJPEG:
+        return _turbo_jpeg.encode(frame, quality=_JPEG_QUALITY)
+    ret, jpeg = cv2.imencode('.jpg', frame, _CV2_JPEG_PARAMS)
+    return jpeg.tobytes() if ret else None
+
+
+# MJPEG 流的共享帧：三槽轮转缓冲，生产者写入下一槽后发布下标
+# （GIL 下 int 赋值原子），消费者直接拿引用编码——原先进出各一次
+# 深拷贝加一把锁，720p 下每帧搬 ~5.4MB 还让 HTTP 线程和事件循环
+# 互相争锁。三个槽位保证编码器读 A 槽时生产者至少隔两帧才会回绕；
+# 极端慢的客户端可能看到一帧撕裂，对预览流可接受
+_frame_buffers: list = []
+_current_index: int = -1
+
+# 新帧信号：条件变量 + 递增序号。多个 MJPEG 客户端各自记住已消费
+# 的序号，只在新帧发布时被唤醒（单个 Event 会被先醒的客户端 clear
+# 掉，丢其他客户端的唤醒）
+_frame_cond = threading.Condition()
+_frame_seq = 0
+
+# 共享 JPEG 编码：单个编码线程消费新帧信号，编码结果（bytes）发布
+# 给所有 MJPEG 客户端——编码成本 O(1)，与客户端数无关；首个客户端
+# 连入时惰性启动
+_jpeg_cond = threading.Condition()
+_latest_jpeg: Optional[bytes] = None
+_jpeg_seq = 0
+_encoder_thread: Optional[threading.Thread] = None
+_encoder_start_lock = threading.Lock()
+
+# 在线的 MJPEG 客户端数：为 0 时处理循环跳过绘制/发布，编码线程
+# 也不编码（计数增减在各自 handler 线程，加锁保护）
+_mjpeg_clients = 0
+_mjpeg_clients_lock = threading.Lock()
+
+
+def mjpeg_client_count() -> int:
+    """当前连接的 MJPEG 流客户端数"""
+    return _mjpeg_clients
+
+
+def _jpeg_encoder_loop():
+    """共享编码线程：新帧到达即编码一次，通知所有流客户端"""
+    global _latest_jpeg, _jpeg_seq
+    last_seq = -1
+    while True:
+        with _frame_cond:
+            _frame_cond.wait_for(lambda: _frame_seq != last_seq, timeout=1.0)
+            if _frame_seq == last_seq:
+                continue
+            last_seq = _frame_seq
+        if _mjpeg_clients == 0:
+            continue
+        frame = get_current_frame()
+        if frame is None:
+            continue
+        jpeg = encode_jpeg(frame)
+        if jpeg is None:
+            continue
+        # 预拼好完整的 multipart 块（边界 + 头 + 数据 + 尾），
+        # 每个客户端一次 write 写完；拼接在这里做一次，所有
+        # 客户端共享同一 bytes
+        chunk = b"".join((
+            b"--frame\r\nContent-Type: image/jpeg\r\n"
+            b"Content-Length: %d\r\n\r\n" % len(jpeg),
+            jpeg,
+            b"\r\n",
+        ))
+        with _jpeg_cond:
+            _latest_jpeg = chunk
+            _jpeg_seq += 1
+            _jpeg_cond.notify_all()
+
+
+def _ensure_encoder_thread():
+    """惰性启动共享编码线程（无客户端时不占用 CPU）"""
+    global _encoder_thread
+    with _encoder_start_lock:
+        if _encoder_thread is None:
+            _encoder_thread = threading.Thread(
+                target=_jpeg_encoder_loop, daemon=True)
+            _encoder_thread.start()
 
 
 def set_current_frame(frame: np.ndarray):
-    """Set current frame for MJPEG streaming"""
-    global _current_frame
-    with _frame_lock:
-        _current_frame = frame.copy()
+    """发布一帧供 MJPEG 流读取（写入轮转槽位，无锁无出站拷贝）"""
+    global _current_index, _frame_seq
+    if not _frame_buffers or _frame_buffers[0].shape != frame.shape:
+        _frame_buffers[:] = [np.empty_like(frame) for _ in range(3)]
+        _current_index = -1
+    idx = (_current_index + 1) % 3
+    np.copyto(_frame_buffers[idx], frame)
+    _current_index = idx
+    with _frame_cond:
+        _frame_seq += 1
+        _frame_cond.notify_all()
 
 
 def get_current_frame() -> Optional[np.ndarray]:
-    """Get current frame for MJPEG streaming"""
-    global _current_frame
-    with _frame_lock:
-        return _current_frame.copy() if _current_frame is not None else None
+    """取最近发布的一帧（只读引用，编码器只读不写）"""
+    idx = _current_index
+    if idx < 0:
+        return None
+    return _frame_buffers[idx]
 
 
 class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
@@ -64,21 +182,30 @@ class MJPEGHandler(BaseHTTPRequestHandler):
             self.send_header('Access-Control-Allow-Origin', '*')
             self.end_headers()
 
+            global _mjpeg_clients
+            _ensure_encoder_thread()
+            with _mjpeg_clients_lock:
+                _mjpeg_clients += 1
             try:
+                # 事件驱动：只在共享编码线程发布新 JPEG 时醒来写出，
+                # 不再按固定 33ms 轮询，也不做逐客户端编码
+                last_seq = -1
                 while True:
-                    frame = get_current_frame()
-                    if frame is not None:
-                        # Encode frame as JPEG
-                        ret, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
-                        if ret:
-                            self.wfile.write(b'--frame\r\n')
-                            self.wfile.write(b'Content-Type: image/jpeg\r\n\r\n')
-                            self.wfile.write(jpeg.tobytes())
-                            self.wfile.write(b'\r\n')
-                            self.wfile.flush()
-                    time.sleep(0.033)  # ~30 FPS
+                    with _jpeg_cond:
+                        _jpeg_cond.wait_for(
+                            lambda: _jpeg_seq != last_seq, timeout=1.0)
+                        if _jpeg_seq == last_seq:
+                            continue  # 超时无新帧（如摄像头未就绪）
+                        last_seq = _jpeg_seq
+                        chunk = _latest_jpeg
+                    # 整块一次写出：边界/头/数据已在编码线程拼好
+                    self.wfile.write(chunk)
+                    self.wfile.flush()
             except (BrokenPipeError, ConnectionResetError):
                 pass
+            finally:
+                with _mjpeg_clients_lock:
+                    _mjpeg_clients -= 1
         else:
             self.send_response(404)
             self.end_headers()
@@ -91,15 +218,29 @@ def run_mjpeg_server(host: str, port: int):
     server.serve_forever()
 
 
+def encode_message(msg_type: str, timestamp: float, data: Dict[str, Any]) -> str:
+    """直接编码一条出站消息（信封字典字面量，无 dataclass 构造）"""
+    payload = {
+        "type": msg_type,
+        "timestamp": timestamp,
+        "data": data,
+    }
+    if _HAS_ORJSON:
+        # 前端按文本帧 JSON.parse，这里 decode 回 str
+        return orjson.dumps(
+            payload, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(payload, ensure_ascii=False)
+
+
 @dataclass
 class WebSocketMessage:
-    """WebSocket 消息结构"""
+    """WebSocket 消息结构（低频路径用；每帧热路径直接走 encode_message）"""
     type: str
     timestamp: float
     data: Dict[str, Any]
 
     def to_json(self) -> str:
-        return json.dumps(asdict(self), ensure_ascii=False)
+        return encode_message(self.type, self.timestamp, self.data)
 
     @classmethod
     def from_json(cls, json_str: str) -> "WebSocketMessage":
@@ -130,6 +271,13 @@ class PhantomHandServer:
         self._running = False
         self._processing_task: Optional[asyncio.Task] = None
 
+        # 事件广播队列：同步回调只入队（有界，满则丢弃），由单个
+        # 广播协程消费——不再在回调里 create_task（每事件一个 Task
+        # 对象，且依赖恰好有运行中的事件循环）
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event_q: Optional[asyncio.Queue] = None
+        self._broadcaster_task: Optional[asyncio.Task] = None
+
         # 统计信息
         self._frame_count = 0
         self._start_time = 0.0
@@ -138,6 +286,11 @@ class PhantomHandServer:
         """启动服务"""
         print("[SERVER] 正在初始化组件...")
 
+        self._loop = asyncio.get_running_loop()
+        self._event_q = asyncio.Queue(maxsize=256)
+        self._broadcaster_task = self._loop.create_task(
+            self._event_broadcaster())
+
         # 初始化摄像头
         self.camera = CameraCapture(
             device_id=self.config.camera.device_id,
@@ -151,10 +304,24 @@ class PhantomHandServer:
             raise RuntimeError("无法启动摄像头")
 
         # 初始化检测器
+        # tracking_only_frames=2：隔帧用光流从上一帧关键点外推，
+        # 跳过一半的模型推理；光流失败的手会在下一帧回落到完整
+        # 检测（MediaPipe 图内部也只在跟踪置信度跌破阈值时重跑
+        # 手掌检测器，这里是在其上再省掉关键点模型的一半调用）。
+        # models/ 下放置 hand_landmarker.task 即启用 Tasks API 并
+        # 优先尝试 GPU 委托，文件不存在则照常走旧版 Solutions
+        model_path = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            "models", "hand_landmarker.task"
+        )
         self.detector = HandDetector(
             max_num_hands=2,
             min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
+            min_tracking_confidence=0.5,
+            model_path=model_path,
+            delegate="gpu",
+            tracking_only_frames=2,
+            max_detect_width=640
         )
 
         # 初始化分类器
@@ -176,6 +343,10 @@ class PhantomHandServer:
             t_cooldown=self.config.state_machine.t_cooldown
         )
 
+        # 预热 JIT 内核，首帧不再付编译成本
+        self.classifier.warmup()
+        self.state_machine.warmup()
+
         # 注册手势事件回调
         self.state_machine.register_callback(self._on_gesture_event)
 
@@ -204,6 +375,13 @@ class PhantomHandServer:
             except asyncio.CancelledError:
                 pass
 
+        if self._broadcaster_task:
+            self._broadcaster_task.cancel()
+            try:
+                await self._broadcaster_task
+            except asyncio.CancelledError:
+                pass
+
         # 关闭连接
         for client in self._clients.copy():
             await client.close()
@@ -240,9 +418,32 @@ class PhantomHandServer:
                 meta=event.meta
             )
 
-        # 广播事件（不广播 hold 事件，避免消息过多）
-        if event.event_type != "hold":
-            asyncio.create_task(self._broadcast_event(event))
+        # 广播事件（不广播 hold 事件，避免消息过多）。
+        # call_soon_threadsafe：回调线程无关，入队失败（队满，说明
+        # 消费端停转）直接丢弃而不是无界积压
+        if event.event_type != "hold" and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._enqueue_event, event)
+
+    def _enqueue_event(self, event: GestureEvent):
+        """把事件放入广播队列（事件循环线程内执行）"""
+        try:
+            self._event_q.put_nowait(event)
+        except asyncio.QueueFull:
+            print("[WARN] 事件广播队列已满，丢弃事件")
+
+    async def _event_broadcaster(self):
+        """事件广播协程：一次醒来清空积压，逐条发送"""
+        q = self._event_q
+        while True:
+            event = await q.get()
+            await self._broadcast_event(event)
+            # 批量清空积压（每条仍是独立消息，保持线上格式不变）
+            while True:
+                try:
+                    event = q.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                await self._broadcast_event(event)
 
     def _on_active_changed(self, active: bool):
         """激活状态变更回调（由手势触发）"""
@@ -260,34 +461,33 @@ class PhantomHandServer:
         if not self._clients:
             return
 
-        message = WebSocketMessage(
-            type="gesture_event",
-            timestamp=event.timestamp,
-            data=event.to_dict()
-        )
-
-        await self._broadcast(message.to_json())
+        await self._broadcast(encode_message(
+            "gesture_event", event.timestamp, event.to_dict()))
 
     async def _broadcast(self, message: str):
         """广播消息到所有客户端"""
         if not self._clients:
             return
 
-        # 并发发送
-        await asyncio.gather(
-            *[client.send(message) for client in self._clients.copy()],
-            return_exceptions=True
-        )
+        # websockets.broadcast 只把消息序列化成 WS 帧一次，写入所有
+        # 连接（逐客户端 send 则每个连接各编码一遍）；它不等待发送
+        # 完成，写缓冲打满的慢客户端直接跳过，不会反压循环。
+        # 同步迭代、无 await，集合不可能中途变化，无需 copy() 快照
+        websockets.broadcast(self._clients, message)
 
     async def _process_frames(self):
         """帧处理主循环"""
         print("[SERVER] 开始帧处理...")
 
         while self._running:
-            # 读取帧
-            frame = self.camera.read(timeout=0.1)
+            # 读取帧。CameraCapture 内部是单槽缓冲（deque(maxlen=1)）：
+            # 采集线程写入新帧时自动挤掉未消费的旧帧，read 拿到的
+            # 永远是最新一帧——推理落后时过期帧在入队侧就被丢弃，
+            # 端到端延迟有界，无需在此再做 drain 循环。
+            # read_async 把等待放进执行器线程：事件循环保持运转，
+            # 新帧到达即恢复，无需 sleep 轮询垫片
+            frame = await self.camera.read_async(timeout=0.1)
             if frame is None:
-                await asyncio.sleep(0.01)
                 continue
 
             self._frame_count += 1
@@ -300,12 +500,18 @@ class PhantomHandServer:
             )
             self._last_detection = detection
 
-            # 绘制骨骼并更新 MJPEG 流
-            output_frame = self.detector.draw_landmarks(frame.image, detection)
-            set_current_frame(output_frame)
+            # 绘制骨骼并更新 MJPEG 流（没有流客户端就整条跳过：
+            # 绘制与发布只为预览服务）
+            if mjpeg_client_count() > 0:
+                output_frame = self.detector.draw_landmarks(
+                    frame.image, detection)
+                set_current_frame(output_frame)
 
-            # 处理每只手
+            # 处理每只手。识别/状态机/动作执行始终运行；
+            # 序列化和广播只在有 WebSocket 客户端时做
+            has_ws_clients = bool(self._clients)
             hands_data = []
+            frame_events = []
             for hand in detection.hands:
                 # 分类手势
                 gesture_proba = self.classifier.classify(hand)
@@ -329,7 +535,8 @@ class PhantomHandServer:
                         if self.action_executor:
                             self.action_executor.execute_slide(direction, distance)
 
-                        # 广播滑动事件
+                        # 滑动事件并入本帧的 frame_data 消息，
+                        # 不再在循环中途单独 await 一次广播
                         slide_event = GestureEvent(
                             event_type="slide",
                             gesture=f"slide_{direction}",
@@ -339,35 +546,37 @@ class PhantomHandServer:
                             confidence=1.0,
                             meta={"direction": direction, "distance": distance}
                         )
-                        await self._broadcast_event(slide_event)
+                        if has_ws_clients:
+                            frame_events.append(slide_event.to_dict())
 
-                # 构建手部数据
+                # 构建手部数据（仅在有客户端时付序列化成本）
+                if not has_ws_clients:
+                    continue
                 hand_data = {
                     "id": hand.hand_id,
                     "handedness": hand.handedness,
-                    "landmarks": hand.landmarks.tolist(),
+                    # orjson 直接序列化 ndarray，省掉 tolist() 的
+                    # 逐元素装箱；标准库路径仍需转换
+                    "landmarks": (hand.landmarks if _HAS_ORJSON
+                                  else hand.landmarks.tolist()),
                     "gesture": gesture_proba.dominant_gesture,
                     "gesture_score": gesture_proba.dominant_score,
-                    "state": state.state.value if state else "idle"
+                    "state": state.state.label if state else "idle"
                 }
                 hands_data.append(hand_data)
 
-            # 广播帧数据
-            message = WebSocketMessage(
-                type="frame_data",
-                timestamp=frame.timestamp,
-                data={
+            # 广播帧数据（直接编码，不经 WebSocketMessage 中转）
+            if not has_ws_clients:
+                continue
+            await self._broadcast(encode_message(
+                "frame_data", frame.timestamp, {
                     "frame_id": frame.frame_id,
                     "hands": hands_data,
+                    "events": frame_events,
                     "inference_time_ms": detection.inference_time_ms,
                     "active": self.action_executor.is_active() if self.action_executor else False
                 }
-            )
-
-            await self._broadcast(message.to_json())
-
-            # 控制帧率
-            await asyncio.sleep(0.001)
+            ))
 
     async def handle_client(self, websocket: WebSocketServerProtocol):
         """处理客户端连接"""
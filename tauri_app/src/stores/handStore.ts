@@ -190,6 +190,23 @@ function handleMessage(
       store.leftHand = leftHand
       store.rightHand = rightHand
 
+      // 随帧携带的手势事件（如滑动）：后端不再单发 gesture_event，
+      // 与下方 gesture_event 分支同样映射到 lastEvent
+      const events = rawData.events as Array<Record<string, unknown>> || []
+      for (const rawEvent of events) {
+        const frameEvent: GestureEvent = {
+          eventType: rawEvent.event_type as GestureEvent['eventType'],
+          gesture: rawEvent.gesture as string,
+          handId: rawEvent.hand_id as string,
+          timestamp: rawEvent.timestamp as number,
+          holdDuration: rawEvent.hold_duration as number,
+          confidence: rawEvent.confidence as number,
+          meta: rawEvent.meta as Record<string, unknown>
+        }
+        console.log('[EVENT]', frameEvent.eventType, frameEvent.gesture)
+        set({ lastEvent: frameEvent })
+      }
+
       // 只更新统计信息（这会触发订阅了这些值的组件重渲染）
       // 注意：不再从 frame_data 更新 isActive，避免覆盖用户的设置
       // isActive 只在连接时从 welcome 消息同步，之后由用户控制